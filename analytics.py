@@ -0,0 +1,145 @@
+#==============================================================================#
+# analytics.py measures the shape of a generated maze, such as its dead ends,  #
+# branches and longest path. created by Andy Phan.                             #
+#==============================================================================#
+
+import constants
+from mazefile import unpack_walls
+from pathindex import search
+
+NORTH = constants.NORTH
+EAST = constants.EAST
+SOUTH = constants.SOUTH
+WEST = constants.WEST
+
+DEGREE_TABLE = bytes(bin(value & 0x0F).count("1") for value in range(256)) # open walls of each path value
+
+def get_degrees(walls):
+  """
+  Takes in bytes walls of one open-wall value per cell and returns bytes of the
+  number of open walls of each cell, in one pass over the walls.
+  """
+  return walls.translate(DEGREE_TABLE)
+
+def get_branch_lengths(walls, degrees, width):
+  """
+  Takes in bytes walls and degrees of every cell of a perfect maze of int width and
+  returns a list of the int length of every branch, a path between two cells that
+  are not corridors with only corridors in between. Each branch is walked once.
+  """
+  steps = ((NORTH, -width), (EAST, 1), (SOUTH, width), (WEST, -1))
+  walked = bytearray(len(walls)) # last corridor cell of every branch walked
+  lengths = []
+  for node in range(len(walls)):
+    if degrees[node] == 2:
+      continue
+    node_walls = walls[node]
+    for bit, step in steps:
+      if not node_walls & bit:
+        continue
+      cell = node + step
+      if degrees[cell] != 2:
+        if node < cell:
+          lengths.append(1)
+        continue
+      if walked[cell]:
+        continue
+      previous = node
+      length = 1
+      while degrees[cell] == 2:
+        cell_walls = walls[cell]
+        for direction, offset in steps:
+          if cell_walls & direction and cell + offset != previous:
+            previous, cell = cell, cell + offset
+            break
+        length += 1
+      walked[previous] = 1
+      lengths.append(length)
+  return lengths
+
+"""
+Algorithm:
+1) Count the open walls of every cell with one table lookup per cell. Cells with
+  one are dead ends, cells with two are corridors and cells with more are
+  junctions.
+2) Walk from every cell that is not a corridor along each of its open walls until
+  the next cell that is not a corridor to find the length of each branch.
+3) Search from the starting cell to find the solution length and the cell farthest
+  from the start. In a tree, the farthest cell from any cell is one end of a
+  longest path.
+4) Search again from that cell. The farthest cell from it is the other end, and its
+  distance is the diameter of the maze.
+"""
+def analyze_walls(walls, width, start_num=0, end_num=None):
+  """
+  Takes in bytes walls of one open-wall value per cell of a perfect maze of int
+  width, and the int cell numbers of its start and end, the last cell by default.
+  Returns a dictionary of statistics about the maze, described in analyze. Runs in
+  O(n), so it also suits mazes that never become a Maze, such as batch output.
+  """
+  total = len(walls)
+  if end_num is None:
+    end_num = total - 1
+  degrees = get_degrees(walls)
+  histogram = [degrees.count(degree) for degree in range(5)]
+  lengths = get_branch_lengths(walls, degrees, width)
+  branches = {}
+  for length in lengths:
+    branches[length] = branches.get(length, 0) + 1
+  parent, distance, order = search(walls, width, start_num)
+  farthest = order[-1]
+  solution_length = distance[end_num]
+  parent, other_distance, order = search(walls, width, farthest)
+  other = order[-1]
+  return {
+    "cells": total,
+    "dead_ends": histogram[1],
+    "degrees": histogram,
+    "river": histogram[2] / total,
+    "branches": dict(sorted(branches.items())),
+    "average_branch_length": sum(lengths) / len(lengths) if lengths else 0,
+    "diameter": other_distance[other],
+    "diameter_ends": (farthest, other),
+    "solution_length": solution_length,
+    "solution_ratio": solution_length / total
+  }
+
+def analyze(maze):
+  """
+  Takes in a generated Maze and returns a dictionary of statistics about its shape:
+  "cells": int number of cells.
+  "dead_ends": int number of cells with one open wall.
+  "degrees": list of the int number of cells with 0 to 4 open walls. Cells with 3 or
+    4 are junctions.
+  "river": float fraction of cells that are corridors, with two open walls. Mazes
+    with long winding passages score high.
+  "branches": dictionary of int branch length to the int number of branches that
+    long, where a branch runs between two cells that are not corridors.
+  "average_branch_length": float mean length of the branches.
+  "diameter": int length of the longest path in the maze.
+  "diameter_ends": tuple of the two tuple cells at the ends of that path.
+  "solution_length": int length of the path from the start to the end.
+  "solution_ratio": float solution length per cell.
+  """
+  result = analyze_walls(unpack_walls(maze.path), maze.width, maze.get_number(maze.start),
+                         maze.get_number(maze.end))
+  result["diameter_ends"] = tuple(maze.get_cell(cell_num) for cell_num in result["diameter_ends"])
+  return result
+
+def move_to_diameter(maze, result=None):
+  """
+  Moves the start and end of a generated Maze to the ends of its longest path,
+  clearing any solution, so it is as long as the maze allows. Takes in the
+  dictionary result of analyze if it was already found. Returns the result with the
+  solution length updated.
+  """
+  if result is None:
+    result = analyze(maze)
+  maze.grid[maze.get_number(maze.start)] = constants.VISITED
+  maze.grid[maze.get_number(maze.end)] = constants.VISITED
+  maze.start, maze.end = result["diameter_ends"]
+  maze.solution = []
+  maze.restore_maze()
+  result = dict(result, solution_length=result["diameter"])
+  result["solution_ratio"] = result["diameter"] / result["cells"]
+  return result
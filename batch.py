@@ -0,0 +1,105 @@
+#==============================================================================#
+# batch.py generates many mazes at once across worker processes. created by    #
+# Andy Phan.                                                                   #
+#==============================================================================#
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import constants
+from mazefile import write_maze, MIN_SEED, MAX_SEED
+from tiled import generate_one, generate_tiled, DEFAULT_TILE_SIZE
+
+GEN_ALGORITHMS = constants.GEN_ALGORITHMS
+
+CHUNK_SIZE = 64 # mazes handed to a worker at a time
+
+def generate_batch(algorithm, width, height, count, seed_base=0, workers=1):
+  """
+  Generates int count mazes with the string algorithm and int width and height,
+  seeded with seed_base, seed_base + 1 and so on. Yields (seed, open-wall bytes)
+  in seed order, so the result is the same for any int number of workers. Only a
+  few chunks of jobs are in flight at once, so count can be very large.
+  """
+  if workers <= 1:
+    for seed in range(seed_base, seed_base + count):
+      yield seed, generate_one((algorithm, width, height, seed))
+    return
+  with ProcessPoolExecutor(max_workers=workers) as executor:
+    window = CHUNK_SIZE * workers * 2
+    for start in range(seed_base, seed_base + count, window):
+      chunk = [(algorithm, width, height, seed) for seed in range(start, min(start + window, seed_base + count))]
+      for job, path in zip(chunk, executor.map(generate_one, chunk, chunksize=CHUNK_SIZE)):
+        yield job[3], path
+
+def parse_size(size):
+  """
+  Takes in a string size like "500x300" and returns the tuple (width, height).
+  """
+  width, height = size.lower().split("x")
+  return int(width), int(height)
+
+def parse_seed(seed):
+  """
+  Takes in a string seed and returns it as an int that fits in a maze file.
+  """
+  seed = int(seed)
+  if not MIN_SEED <= seed <= MAX_SEED:
+    raise argparse.ArgumentTypeError("seeds must be from %d to %d" % (MIN_SEED, MAX_SEED))
+  return seed
+
+def main(argv=None):
+  """
+  Command line entry point, run as python -m maze batch or python -m maze tiled.
+  Batch writes each maze as a binary maze file in the output directory, or all of
+  them back to back into one packed file. Tiled writes one giant maze generated in
+  tiles to a binary maze file.
+  """
+  parser = argparse.ArgumentParser(prog="python -m maze")
+  commands = parser.add_subparsers(dest="command", required=True)
+  batch = commands.add_parser("batch", help="generate many mazes without a window")
+  batch.add_argument("--algorithm", choices=GEN_ALGORITHMS, default=GEN_ALGORITHMS[0])
+  batch.add_argument("--size", type=parse_size, default=(constants.DEFAULT_WIDTH, constants.DEFAULT_HEIGHT),
+                     help="maze size as WIDTHxHEIGHT")
+  batch.add_argument("--count", type=int, default=1)
+  batch.add_argument("--seed-base", type=parse_seed, default=0, help="seed of the first maze")
+  batch.add_argument("--workers", type=int, default=os.cpu_count())
+  output = batch.add_mutually_exclusive_group(required=True)
+  output.add_argument("--output", help="directory to write one file per maze into")
+  output.add_argument("--pack", help="file to write all mazes into, one after another")
+  tiled = commands.add_parser("tiled", help="generate one giant maze in tiles across processes")
+  tiled.add_argument("--algorithm", choices=GEN_ALGORITHMS, default=GEN_ALGORITHMS[0])
+  tiled.add_argument("--size", type=parse_size, required=True, help="maze size as WIDTHxHEIGHT")
+  tiled.add_argument("--tile", type=parse_size, default=(DEFAULT_TILE_SIZE, DEFAULT_TILE_SIZE),
+                     help="tile size as WIDTHxHEIGHT")
+  tiled.add_argument("--seed", type=parse_seed)
+  tiled.add_argument("--workers", type=int, default=os.cpu_count())
+  tiled.add_argument("--output", required=True, help="binary maze file to write")
+  args = parser.parse_args(argv)
+  if args.command == "batch" and args.seed_base + args.count - 1 > MAX_SEED:
+    parser.error("--seed-base plus --count goes past the largest seed, %d" % MAX_SEED)
+
+  if args.command == "tiled":
+    width, height = args.size
+    tile_width, tile_height = args.tile
+    maze = generate_tiled(args.algorithm, width, height, tile_width, tile_height, args.seed, args.workers)
+    maze.save(args.output)
+    return
+
+  width, height = args.size
+  start = (0, 0)
+  end = (width-1, height-1)
+  mazes = generate_batch(args.algorithm, width, height, args.count, args.seed_base, args.workers)
+  if args.output is not None:
+    os.makedirs(args.output, exist_ok=True)
+    for seed, path in mazes:
+      with open(os.path.join(args.output, "%d.maze" % seed), "wb") as file:
+        write_maze(file, width, height, path, start, end, args.algorithm, seed)
+  else:
+    with open(args.pack, "wb") as file:
+      for seed, path in mazes:
+        write_maze(file, width, height, path, start, end, args.algorithm, seed)
+
+if __name__ == "__main__":
+  main(sys.argv[1:])
@@ -0,0 +1,145 @@
+#==============================================================================#
+# benchmark.py times every generation and solving algorithm headlessly across  #
+# maze sizes and compares the results against a saved baseline. created by     #
+# Andy Phan.                                                                   #
+#==============================================================================#
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+import constants
+from maze import Maze
+
+GEN_ALGORITHMS = constants.GEN_ALGORITHMS
+SOL_ALGORITHMS = constants.SOL_ALGORITHMS
+
+SIZES = [50, 100, 250, 500, 1000, 2000]
+SEED = 0
+SOLVE_MAZE_ALGORITHM = "Kruskal" # generator of the mazes the solvers run on
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_REPEATS = 3 # timed calls per result, of which the fastest is kept
+
+def run_generation(algorithm, size):
+  """
+  Generates a size by size maze with the given string algorithm and fixed seed.
+  """
+  maze = Maze(size, size)
+  maze.generate(algorithm, seed=SEED)
+
+def run_solve(algorithm, size):
+  """
+  Returns a function that solves a size by size maze with the given string
+  algorithm. The maze is generated beforehand so only solving is measured.
+  """
+  maze = Maze(size, size)
+  maze.generate(SOLVE_MAZE_ALGORITHM, seed=SEED)
+  return lambda: maze.solve(algorithm)
+
+def measure(function, cells, memory=True, repeats=DEFAULT_REPEATS):
+  """
+  Calls function once untimed to warm up, so lazy imports and caches are not
+  counted, then int repeats times to time it, and once more under tracemalloc if
+  memory is True. Returns a dictionary of the fewest seconds taken, cells per
+  second over int cells, and peak bytes allocated.
+  """
+  function()
+  seconds = None
+  for _ in range(repeats):
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    if seconds is None or elapsed < seconds:
+      seconds = elapsed
+  peak = None
+  if memory:
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+  return {"seconds": seconds, "cells_per_second": cells / seconds if seconds else None, "peak_bytes": peak}
+
+def run_suite(sizes=SIZES, generators=GEN_ALGORITHMS, solvers=SOL_ALGORITHMS, memory=True, verbose=True,
+              repeats=DEFAULT_REPEATS):
+  """
+  Runs every string algorithm in generators and solvers over each int size in
+  sizes, timing each int repeats times. Returns a list of result dictionaries.
+  """
+  results = []
+  jobs = [("generate", algorithm) for algorithm in generators] + [("solve", algorithm) for algorithm in solvers]
+  for kind, algorithm in jobs:
+    for size in sizes:
+      if kind == "generate":
+        function = lambda: run_generation(algorithm, size)
+      else:
+        function = run_solve(algorithm, size)
+      result = {"kind": kind, "algorithm": algorithm, "size": size}
+      result.update(measure(function, size * size, memory, repeats))
+      results.append(result)
+      if verbose:
+        print_result(result)
+  return results
+
+def print_result(result):
+  """
+  Prints one result dictionary as a table row.
+  """
+  peak = result["peak_bytes"]
+  print("%-8s %-18s %10s %10.3f s %14.0f cells/s %12s" % (
+    result["kind"], result["algorithm"], "%dx%d" % (result["size"], result["size"]),
+    result["seconds"], result["cells_per_second"] or 0,
+    "-" if peak is None else "%.1f MB" % (peak / 1e6)))
+
+def find_regressions(results, baseline, threshold=DEFAULT_THRESHOLD):
+  """
+  Compares a list of result dictionaries against a list of baseline result
+  dictionaries. Returns a list of (result, baseline result) pairs whose time grew
+  by more than the float threshold fraction.
+  """
+  expected = {(item["kind"], item["algorithm"], item["size"]): item for item in baseline}
+  regressions = []
+  for result in results:
+    previous = expected.get((result["kind"], result["algorithm"], result["size"]))
+    if previous is not None and result["seconds"] > previous["seconds"] * (1 + threshold):
+      regressions.append((result, previous))
+  return regressions
+
+def main(argv=None):
+  """
+  Command line entry point. Runs the suite, saves the results as JSON and exits
+  with status 1 if any result regressed against the given baseline.
+  """
+  parser = argparse.ArgumentParser(description="Benchmark maze generation and solving.")
+  parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+  parser.add_argument("--generators", nargs="*", choices=GEN_ALGORITHMS, default=GEN_ALGORITHMS)
+  parser.add_argument("--solvers", nargs="*", choices=SOL_ALGORITHMS, default=SOL_ALGORITHMS)
+  parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS,
+                      help="timed runs per result, of which the fastest is kept")
+  parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+  parser.add_argument("--output", help="JSON file to save the results to")
+  parser.add_argument("--baseline", help="JSON file of earlier results to compare against")
+  parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                      help="allowed fractional slowdown before failing")
+  args = parser.parse_args(argv)
+  if args.repeats < 1:
+    parser.error("--repeats must be at least 1")
+
+  results = run_suite(args.sizes, args.generators, args.solvers, not args.no_memory, repeats=args.repeats)
+  if args.output is not None:
+    with open(args.output, "w") as file:
+      json.dump({"seed": SEED, "repeats": args.repeats, "results": results}, file, indent=2)
+  if args.baseline is not None:
+    with open(args.baseline) as file:
+      baseline = json.load(file)["results"]
+    regressions = find_regressions(results, baseline, args.threshold)
+    for result, previous in regressions:
+      print("REGRESSION %s %s %dx%d: %.3f s, baseline %.3f s" % (
+        result["kind"], result["algorithm"], result["size"], result["size"],
+        result["seconds"], previous["seconds"]))
+    if regressions:
+      return 1
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,134 @@
+#==============================================================================#
+# cache.py keeps generated mazes in memory and on disk so seeded mazes do not  #
+# have to be generated again. created by Andy Phan.                            #
+#==============================================================================#
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_CAPACITY = 128
+DEFAULT_DISK_LIMIT = 1 << 30
+EXTENSION = ".walls" # raw open-wall bytes, not the binary maze file format
+
+class MazeCache:
+  def __init__(self, capacity=DEFAULT_CAPACITY, directory=None, disk_limit=DEFAULT_DISK_LIMIT):
+    """
+    MazeCache constructor that takes in the int capacity of mazes kept in memory,
+    an optional string directory to also keep mazes on disk, and the int disk_limit
+    in bytes that the directory may use. Keys are tuples of (algorithm, width,
+    height, seed) and values are the open-wall bytes of the maze. The directory is
+    scanned once here, and after that the cache keeps its own index of the files,
+    so only files it wrote or found are ever removed. It can be used from several
+    threads at once.
+    """
+    self.capacity = capacity
+    self.directory = directory
+    self.disk_limit = disk_limit
+    self.memory = OrderedDict()
+    self.files = OrderedDict() # file name -> size, least recently used first
+    self.used = 0 # bytes of the files
+    self.lock = threading.Lock()
+    if directory is not None:
+      os.makedirs(directory, exist_ok=True)
+      self.scan_disk()
+
+  def get(self, key):
+    """
+    Returns the open-wall bytes stored for the tuple key, or None if there are none.
+    Checks memory first, then disk.
+    """
+    with self.lock:
+      if key in self.memory:
+        self.memory.move_to_end(key)
+        return self.memory[key]
+    if self.directory is None:
+      return None
+    name = self.get_file_name(key)
+    file_path = os.path.join(self.directory, name)
+    try:
+      with open(file_path, "rb") as file:
+        path = file.read()
+      os.utime(file_path)
+    except FileNotFoundError:
+      with self.lock:
+        self.used -= self.files.pop(name, 0)
+      return None
+    with self.lock:
+      if name in self.files:
+        self.files.move_to_end(name)
+      self.put_memory(key, path)
+    return path
+
+  def put(self, key, path):
+    """
+    Stores the bytes-like open-wall path of a maze under the tuple key.
+    """
+    path = bytes(path)
+    with self.lock:
+      self.put_memory(key, path)
+    if self.directory is not None:
+      name = self.get_file_name(key)
+      file_path = os.path.join(self.directory, name)
+      temp_path = "%s.%d.tmp" % (file_path, threading.get_ident())
+      with open(temp_path, "wb") as file:
+        file.write(path)
+      os.replace(temp_path, file_path)
+      with self.lock:
+        self.used += len(path) - self.files.pop(name, 0)
+        self.files[name] = len(path)
+        self.trim_disk()
+
+  def put_memory(self, key, path):
+    """
+    Helper method for get and put. Stores the bytes path in memory, removing the
+    least recently used maze if there are more than capacity. Call it holding lock.
+    """
+    self.memory[key] = path
+    self.memory.move_to_end(key)
+    while len(self.memory) > self.capacity:
+      self.memory.popitem(last=False)
+
+  def get_file_name(self, key):
+    """
+    Returns the string file name of the tuple key, a hash of the key.
+    """
+    return hashlib.sha1(repr(key).encode()).hexdigest() + EXTENSION
+
+  def scan_disk(self):
+    """
+    Helper method for the constructor. Indexes the cache files already in the
+    directory from least to most recently used, then trims them to disk_limit.
+    """
+    files = []
+    for entry in os.scandir(self.directory):
+      if entry.name.endswith(EXTENSION) and entry.is_file():
+        stat = entry.stat()
+        files.append((stat.st_mtime, entry.name, stat.st_size))
+    files.sort()
+    for mtime, name, size in files:
+      self.files[name] = size
+      self.used += size
+    with self.lock:
+      self.trim_disk()
+
+  def trim_disk(self):
+    """
+    Removes the least recently used files in the index until they fit in
+    disk_limit. Call it holding lock.
+    """
+    while self.used > self.disk_limit and self.files:
+      name, size = self.files.popitem(last=False)
+      self.used -= size
+      try:
+        os.remove(os.path.join(self.directory, name))
+      except FileNotFoundError:
+        pass
+
+  def clear(self):
+    """
+    Removes every maze from memory. Files on disk are kept.
+    """
+    with self.lock:
+      self.memory.clear()
@@ -16,16 +16,22 @@ SLIDER_X = int(GUI_X + ((WINDOW_WIDTH - GUI_X) / 2) - (SLIDER_SIZE[0] / 2))
 TILE_SIZE = 10
 WALL_SIZE = 5
 MIN_SIZE = 2
-MAX_SIZE = 60
+MAX_SIZE = 4000
+MAX_REPLAY_CELLS = 500 * 500 # largest maze whose steps are recorded for replay
 ROW_WALL = (WALL_SIZE, TILE_SIZE)
 COL_WALL = (TILE_SIZE, WALL_SIZE)
 
 DEFAULT_WIDTH = 10
 DEFAULT_HEIGHT = 10
 
-MIN_DELAY = 0
-MAX_DELAY = 500
-DEFAULT_DELAY = 50
+# animation speed slider, from MIN_STEPS to MAX_STEPS steps per frame on an
+# exponential scale. MAX_SPEED finishes instantly.
+MIN_SPEED = 0
+MAX_SPEED = 100
+DEFAULT_SPEED = 15
+MIN_STEPS = 1 / 30
+MAX_STEPS = 100000
+FRAME_BUDGET = 12 # ms per frame spent playing steps
 
 BLACK = (0, 0, 0)
 WHITE = (255,255,255)
@@ -34,13 +40,27 @@ BLUE = (0, 204, 204)
 RED = (255, 0, 0)
 GREEN = (0, 255, 0)
 
-GEN_ALGORITHMS = ["DFS", "Kruskal", "Prim", "Wilson", "Eller", "Hunt and Kill"]
-SOL_ALGORITHMS = ["DFS", "BFS", "A*"]
+GEN_ALGORITHMS = ["DFS", "Kruskal", "Prim", "Wilson", "Eller", "Hunt and Kill", "Binary Tree", "Sidewinder"]
+SOL_ALGORITHMS = ["DFS", "BFS", "A*", "Bidirectional BFS"]
+
+# cell states, stored as one small int per cell. VISITED is 0 so the states of a
+# finished maze can start out as zero-filled memory.
+VISITED = 0
+UNVISITED = 1
+PROCESSED = 2
+SPECIAL = 3
+PATHFIND = 4
 
 STAGES = {
-  "UNVISITED": GREY,
-  "PROCESSED": BLUE,
-  "VISITED": WHITE,
-  "SPECIAL": RED,
-  "PATHFIND": GREEN
-}
\ No newline at end of file
+  UNVISITED: GREY,
+  PROCESSED: BLUE,
+  VISITED: WHITE,
+  SPECIAL: RED,
+  PATHFIND: GREEN
+}
+
+# open-wall bits, stored as one bitmask per cell
+NORTH = 1
+EAST = 2
+SOUTH = 4
+WEST = 8
\ No newline at end of file
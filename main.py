@@ -6,7 +6,10 @@
 import pygame
 import pygame_gui
 import constants
-from maze import Maze
+from maze import Maze, CancelToken
+from renderer import Renderer
+from replay import EventLog, EventQueue, Replay
+from stats import MazeStats
 from threading import Thread
 
 def main():
@@ -28,15 +31,19 @@ def main():
   WALL_SIZE = constants.WALL_SIZE
   MIN_SIZE = constants.MIN_SIZE
   MAX_SIZE = constants.MAX_SIZE
+  MAX_REPLAY_CELLS = constants.MAX_REPLAY_CELLS
   ROW_WALL = constants.ROW_WALL
   COL_WALL = constants.COL_WALL
 
   DEFAULT_WIDTH = constants.DEFAULT_WIDTH
   DEFAULT_HEIGHT = constants.DEFAULT_HEIGHT
 
-  MIN_DELAY = constants.MIN_DELAY
-  MAX_DELAY = constants.MAX_DELAY
-  DEFAULT_DELAY = constants.DEFAULT_DELAY
+  MIN_SPEED = constants.MIN_SPEED
+  MAX_SPEED = constants.MAX_SPEED
+  DEFAULT_SPEED = constants.DEFAULT_SPEED
+  MIN_STEPS = constants.MIN_STEPS
+  MAX_STEPS = constants.MAX_STEPS
+  FRAME_BUDGET = constants.FRAME_BUDGET
 
   GEN_ALGORITHMS = constants.GEN_ALGORITHMS
   SOL_ALGORITHMS = constants.SOL_ALGORITHMS
@@ -45,6 +52,10 @@ def main():
   WHITE = constants.WHITE
   GREY = constants.GREY
 
+  STATS_INTERVAL = 250 # ms between stats label updates
+  ZOOM_STEP = 1.25
+  PAN_STEP = 50 # pixels moved per arrow key press
+
   screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
   pygame.display.set_caption("MazeAlgorithms by Andy Phan")
 
@@ -59,11 +70,11 @@ def main():
   text_rect.center = (GUI_X_CENTER, 50)
 
   animation_label = pygame_gui.elements.UILabel(relative_rect=pygame.Rect((SLIDER_X, 100), SLIDER_SIZE),
-                                                text="Animation delay: " + str(DEFAULT_DELAY) + " ms",
+                                                text="Speed",
                                                 manager=manager)
   animation_slider = pygame_gui.elements.UIHorizontalSlider(relative_rect=pygame.Rect((SLIDER_X, 120), SLIDER_SIZE),
-                                                            start_value=DEFAULT_DELAY,
-                                                            value_range=(MIN_DELAY, MAX_DELAY),
+                                                            start_value=DEFAULT_SPEED,
+                                                            value_range=(MIN_SPEED, MAX_SPEED),
                                                             manager=manager)
   width_label = pygame_gui.elements.UILabel(relative_rect=pygame.Rect((SLIDER_X, 150), SLIDER_SIZE),
                                             text="Width: " + str(DEFAULT_WIDTH),
@@ -100,22 +111,68 @@ def main():
                                                  text='Solve',
                                                  manager=manager)
 
+  replay_button = pygame_gui.elements.UIButton(relative_rect=pygame.Rect(GUI_X_CENTER - 105, 540, 100, 50),
+                                               text='Replay',
+                                               manager=manager)
+  cancel_button = pygame_gui.elements.UIButton(relative_rect=pygame.Rect(GUI_X_CENTER + 5, 540, 100, 50),
+                                               text='Cancel',
+                                               manager=manager)
+
+  steps_label = pygame_gui.elements.UILabel(relative_rect=pygame.Rect((SLIDER_X, 620), SLIDER_SIZE),
+                                            text="Steps/sec: 0",
+                                            manager=manager)
+  fps_label = pygame_gui.elements.UILabel(relative_rect=pygame.Rect((SLIDER_X, 640), SLIDER_SIZE),
+                                          text="FPS: 0",
+                                          manager=manager)
+  view_label = pygame_gui.elements.UILabel(relative_rect=pygame.Rect((SLIDER_X - 50, 680), (SLIDER_SIZE[0] + 100, SLIDER_SIZE[1])),
+                                           text="Scroll to zoom, drag to pan, F to fit",
+                                           manager=manager)
+
   solve_menu.disable()
   solve_button.disable()
+  replay_button.disable()
+  cancel_button.disable()
 
   threads = []
+  tokens = []
+  logs = []
+  replays = []
 
-  maze = Maze(DEFAULT_WIDTH, DEFAULT_HEIGHT, screen)
+  # the worker threads change maze, and the main thread draws view, its copy that
+  # follows the events the workers push into the queue
+  maze = Maze(DEFAULT_WIDTH, DEFAULT_HEIGHT)
+  view = Maze(DEFAULT_WIDTH, DEFAULT_HEIGHT)
+  events = EventQueue(maze)
+  maze.add_observer(events)
+  renderer = Renderer(screen, view)
+  view.add_observer(renderer)
+  maze.stats = MazeStats()
+  stats_time = [0]
+  step_credit = [0.0]
+  dragging = [False]
 
-  screen.fill(BLACK)
-  maze.draw_maze()
+  def get_steps_per_frame():
+    """
+    Returns the float number of steps to play each frame at the animation slider's
+    speed, from MIN_STEPS to MAX_STEPS on an exponential scale, or None if the
+    slider is at MAX_SPEED to finish instantly.
+    """
+    speed = animation_slider.get_current_value()
+    if speed >= MAX_SPEED:
+      return None
+    return MIN_STEPS * (MAX_STEPS / MIN_STEPS) ** ((speed - MIN_SPEED) / (MAX_SPEED - 1 - MIN_SPEED))
 
-  def animation_slider_event(maze):
+  def animation_slider_event():
     """
-    Changes text of animation delay label to the animation slider's value.
+    Changes text of the animation speed label to the animation slider's speed.
     """
-    delay = animation_slider.get_current_value()
-    animation_label.set_text("Animation delay: " + str(delay) + " ms")
+    steps = get_steps_per_frame()
+    if steps is None:
+      animation_label.set_text("Speed: instant")
+    elif steps * FPS < 100:
+      animation_label.set_text("Speed: %.3g steps/s" % (steps * FPS))
+    else:
+      animation_label.set_text("Speed: %d steps/s" % (steps * FPS))
 
   def size_slider_event(isWidth):
     """
@@ -129,61 +186,165 @@ def main():
     else:
       height_label.set_text("Height: " + str(height))
     if maze.width != width or maze.height != height:
-      maze.reset_maze(width, height, screen)
-      screen.fill(BLACK)
-      maze.draw_maze()
+      cancel_jobs()
+      maze.reset_maze(width, height)
+      logs.clear()
       solve_menu.disable()
       solve_button.disable()
+      replay_button.disable()
+
+  def record_log():
+    """
+    Returns a new EventLog of the maze to pass to the next generation or solve, so
+    it can be replayed. Returns None for mazes over MAX_REPLAY_CELLS cells, whose
+    logs would take too much memory to keep, and the replay button stays disabled.
+    """
+    logs.clear()
+    if maze.total > MAX_REPLAY_CELLS:
+      return None
+    logs.append(EventLog(maze))
+    return logs[-1]
 
   def generate_button_event():
     """
-    Generates the maze using the algorithm and delay to display on screen.
+    Generates the maze using the algorithm to display on screen.
     """
+    cancel_jobs()
     disable_ui()
     algorithm = generation_menu.selected_option
-    delay = animation_slider.get_current_value()
-    thread = Thread(target=maze.generate, args=(algorithm, delay), kwargs={})
+    log = record_log()
+    token = CancelToken()
+    thread = Thread(target=maze.generate, args=(algorithm, log), kwargs={"token": token})
     thread.daemon = True
     threads.append(thread)
+    tokens.append(token)
     thread.start()
 
   def solve_button_event():
     """
-    Solves the maze using the algorithm and delay to display on screen.
+    Solves the maze using the algorithm to display on screen.
     """
+    cancel_jobs()
     disable_ui()
     algorithm = solve_menu.selected_option
-    delay = animation_slider.get_current_value()
-    thread = Thread(target=maze.solve, args=(algorithm, delay), kwargs={})
+    log = record_log()
+    token = CancelToken()
+    thread = Thread(target=maze.solve, args=(algorithm, log), kwargs={"token": token})
     thread.daemon = True
     threads.append(thread)
+    tokens.append(token)
     thread.start()
 
+  def replay_button_event():
+    """
+    Replays the last generation or solve on screen without running it again.
+    """
+    disable_ui()
+    replays.append(Replay(logs[-1], view))
+
+  def cancel_jobs():
+    """
+    Stops the running generation, solve, or replay. Waits for the worker thread to
+    leave the maze in a consistent state, showing its last events, and finishes a
+    replay at its end so the view matches the maze.
+    """
+    for token in tokens:
+      token.cancel()
+    for thread in threads:
+      while thread.is_alive():
+        events.apply(view)
+        thread.join(0.01)
+    events.sync()
+    events.apply(view)
+    events.live = True
+    for replay in replays:
+      replay.seek(len(replay))
+    was_running = threads or replays
+    threads.clear()
+    tokens.clear()
+    replays.clear()
+    if was_running:
+      enable_ui()
+
+  def take_steps():
+    """
+    Returns the int number of steps to play this frame, adding the steps per frame
+    of the animation speed to the steps left over from earlier frames. Returns None
+    to finish instantly.
+    """
+    steps = get_steps_per_frame()
+    if steps is None:
+      step_credit[0] = 0
+      return None
+    step_credit[0] += steps
+    count = int(step_credit[0])
+    step_credit[0] -= count
+    return count
+
+  def step_job():
+    """
+    Plays the running worker thread's steps on the view, as many as the animation
+    speed allows this frame within FRAME_BUDGET ms. At the highest speed the worker
+    stops pushing steps and the view catches up with one snapshot once it is done.
+    Enables the UI once the worker is done and every step is shown.
+    """
+    count = take_steps()
+    events.live = count is not None
+    alive = threads[0].is_alive() # read once, so a worker that just finished is synced
+    if not alive:
+      events.sync()
+    events.apply(view, count, FRAME_BUDGET / 1000)
+    if not alive and events.is_empty():
+      threads.pop(0)
+      tokens.pop(0)
+      events.live = True
+      enable_ui()
+
+  def replay_step():
+    """
+    Plays the current replay forward by as many steps as the animation speed allows
+    this frame. Enables the UI once it is done.
+    """
+    replay = replays[0]
+    count = take_steps()
+    if count is None:
+      replay.seek(len(replay))
+    else:
+      replay.step(count)
+    if replay.is_done():
+      replays.pop(0)
+      enable_ui()
+
   def disable_ui():
     """
-    Disables sliders, buttons, and dropdown menus.
+    Disables sliders, buttons, and dropdown menus, except the animation slider and
+    the cancel button.
     """
     width_slider.disable()
     height_slider.disable()
     generate_button.disable()
-    animation_slider.disable()
     generation_menu.disable()
     solve_menu.disable()
     solve_button.disable()
+    replay_button.disable()
+    cancel_button.enable()
 
   def enable_ui():
     """
     Enables sliders, buttons, and dropdown menus. Only enables solve menu and
-    solve button if maze is fully generated.
+    solve button if maze is fully generated, and replay button if there is
+    something to replay.
     """
     width_slider.enable()
     height_slider.enable()
     generate_button.enable()
-    animation_slider.enable()
     generation_menu.enable()
+    cancel_button.disable()
     if maze.is_generated():
       solve_menu.enable()
       solve_button.enable()
+    if logs:
+      replay_button.enable()
 
   def gui_event(event):
     """
@@ -194,24 +355,73 @@ def main():
         generate_button_event()
       elif event.ui_element == solve_button:
         solve_button_event()
+      elif event.ui_element == replay_button:
+        replay_button_event()
+      elif event.ui_element == cancel_button:
+        cancel_jobs()
     elif event.user_type == pygame_gui.UI_HORIZONTAL_SLIDER_MOVED:
       if event.ui_element == width_slider:
         size_slider_event(True)
       elif event.ui_element == height_slider:
         size_slider_event(False)
       elif event.ui_element == animation_slider:
-        animation_slider_event(maze)
+        animation_slider_event()
+
+  def stats_event():
+    """
+    Updates the steps per second and FPS labels a few times per second.
+    """
+    now = pygame.time.get_ticks()
+    if now - stats_time[0] < STATS_INTERVAL:
+      return
+    stats_time[0] = now
+    steps_label.set_text("Steps/sec: " + str(int(maze.stats.get_rate())))
+    fps_label.set_text("FPS: " + str(int(clock.get_fps())))
+
+  def viewport_event(event):
+    """
+    Function that takes in any event and zooms or pans the maze view. Scrolling
+    zooms around the mouse, dragging pans, arrow keys pan, plus and minus zoom, and
+    F fits the whole maze in view.
+    """
+    if event.type == pygame.MOUSEWHEEL:
+      point = pygame.mouse.get_pos()
+      if renderer.rect.collidepoint(point):
+        renderer.zoom(ZOOM_STEP ** event.y, point)
+    elif event.type == pygame.MOUSEBUTTONDOWN and event.button in (1, 2, 3):
+      if renderer.rect.collidepoint(event.pos):
+        dragging[0] = True
+    elif event.type == pygame.MOUSEBUTTONUP and event.button in (1, 2, 3):
+      dragging[0] = False
+    elif event.type == pygame.MOUSEMOTION and dragging[0]:
+      renderer.pan(*event.rel)
+    elif event.type == pygame.KEYDOWN:
+      if event.key == pygame.K_LEFT:
+        renderer.pan(PAN_STEP, 0)
+      elif event.key == pygame.K_RIGHT:
+        renderer.pan(-PAN_STEP, 0)
+      elif event.key == pygame.K_UP:
+        renderer.pan(0, PAN_STEP)
+      elif event.key == pygame.K_DOWN:
+        renderer.pan(0, -PAN_STEP)
+      elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+        renderer.zoom(ZOOM_STEP)
+      elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+        renderer.zoom(1 / ZOOM_STEP)
+      elif event.key == pygame.K_f:
+        renderer.fit()
 
   def draw_default():
     """
     Draws all parts of the program.
     """
     screen.fill(BLACK)
-    maze.draw_maze()
+    renderer.draw()
     pygame.draw.rect(screen, GREY, gui)
     screen.blit(text, text_rect)
     manager.draw_ui(screen)
 
+  animation_slider_event()
   while running:
     time_delta = clock.tick(FPS)/1000.0
     for event in pygame.event.get():
@@ -219,13 +429,20 @@ def main():
         running = False
       elif event.type == pygame.USEREVENT:
         gui_event(event)
+      else:
+        viewport_event(event)
       manager.process_events(event)
     manager.update(time_delta)
-    if threads and not threads[0].is_alive():
-      enable_ui()
-      threads.pop(0)
+    if threads:
+      step_job()
+    else:
+      events.apply(view)
+    if replays:
+      replay_step()
+    stats_event()
     draw_default()
     pygame.display.update()
+  cancel_jobs()
 
 if __name__ == "__main__":
   main()
\ No newline at end of file
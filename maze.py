@@ -1,171 +1,216 @@
 #==============================================================================#
-# maze.py controls maze data, display, generation, and solving. created by     #
-# Andy Phan.                                                                   #
+# maze.py controls maze data, generation, and solving. created by Andy Phan.   #
 #==============================================================================#
 
 import random
-from random import randrange, getrandbits
 import time
-import pygame
 import constants
 import heapq
+import mmap
+from array import array
+from collections import deque
+from itertools import islice
+from mazefile import write_maze, map_maze
 
-WINDOW_WIDTH = constants.WINDOW_WIDTH
-WINDOW_HEIGHT = constants.WINDOW_HEIGHT
-
-TILE_SIZE = constants.TILE_SIZE
-WALL_SIZE = constants.WALL_SIZE
 MIN_SIZE = constants.MIN_SIZE
 MAX_SIZE = constants.MAX_SIZE
-ROW_WALL = constants.ROW_WALL
-COL_WALL = constants.COL_WALL
 
 DEFAULT_WIDTH = constants.DEFAULT_WIDTH
 DEFAULT_HEIGHT = constants.DEFAULT_HEIGHT
 
-STAGES = constants.STAGES
+UNVISITED = constants.UNVISITED
+PROCESSED = constants.PROCESSED
+VISITED = constants.VISITED
+SPECIAL = constants.SPECIAL
+PATHFIND = constants.PATHFIND
 
-class Maze:
-  def __init__(self, width, height, screen):
+NORTH = constants.NORTH
+EAST = constants.EAST
+SOUTH = constants.SOUTH
+WEST = constants.WEST
+
+# maps PROCESSED to VISITED and leaves every other state alone
+RESTORE_TABLE = bytes(VISITED if state == PROCESSED else state for state in range(256))
+# maps every state to VISITED
+CLEAR_TABLE = bytes([VISITED]) * 256
+BLOCK_SIZE = 1 << 20 # cells restored at a time
+
+class Cancelled(Exception):
+  """
+  Raised inside a generation or solving algorithm once its CancelToken is cancelled.
+  """
+
+class CancelToken:
+  def __init__(self):
     """
-    Maze constructor that takes in an int width, int height, and screen object of maze
-    to create maze information.
+    CancelToken constructor. Pass it to generate or solve, then call cancel from any
+    thread to stop that job at its next step.
     """
-    self.reset_maze(width, height, screen)
+    self.cancelled = False
+
+  def cancel(self):
+    """
+    Asks the job using this token to stop.
+    """
+    self.cancelled = True
+
+class Maze:
+  def __init__(self, width, height):
+    """
+    Maze constructor that takes in an int width and int height to create maze
+    information. The maze does not draw anything itself; attach observers such as
+    a Renderer with add_observer to display it. Set stats to a MazeStats to count
+    what the algorithms do; while it is None nothing is counted.
+    """
+    self.observers = []
+    self.stats = None
+    self.token = None # CancelToken of the running job
+    self.random = random.Random()
+    self.reset_maze(width, height)
 
   #==============================================================================#
   #                            COMMON HELPER METHODS                             #
   #==============================================================================#
 
-  def reset_maze(self, width, height, screen):
+  def reset_maze(self, width, height, grid=None, path=None):
     """
-    Resets the maze. Takes in int width, int height, and screen object of maze to
-    recreate all maze information.
+    Resets the maze. Takes in int width and int height to recreate all maze
+    information. If a bytes-like grid of cell states and path of open-wall bits are
+    given, they are used instead of an empty maze.
     """
     self.width = width
     self.height = height
     self.total = width * height
     self.start = (0, 0)
     self.end = (self.width-1, self.height-1)
-    self.screen = screen
-    self.start_x = int(((WINDOW_WIDTH / 3 * 2) - (self.width * (TILE_SIZE + WALL_SIZE)) + WALL_SIZE) / 2)
-    self.start_y = int((WINDOW_HEIGHT - (self.height * (TILE_SIZE + WALL_SIZE)) + WALL_SIZE) / 2)
-    self.grid = [["UNVISITED" for x in range(width)] for y in range(height)] # stores cell values
-    self.path = [[[] for x in range(width)] for y in range(height)] # stores what cell connects with others
+    self.algorithm = None
+    self.seed = None
+    if grid is None:
+      grid = bytearray([UNVISITED]) * self.total
+    if path is None:
+      path = bytearray(self.total)
+    self.grid = grid # stores cell state of each cell number
+    self.path = path # stores open-wall bits of each cell number
     self.solution = []
+    for observer in self.observers:
+      observer.on_refresh()
 
-  def restore_maze(self, solution_only=False):
+  def add_observer(self, observer):
     """
-    Resets all PROCESSED cells to VISITED. If given boolean solution_only is False,
-    resets all PATHFIND cells to VISITED as well. Used for solving display.
+    Attaches the given observer to the maze. Observers are notified with
+    on_visit(cell, val) whenever a cell changes state, on_connect(cell, neighbor) and
+    on_disconnect(cell, neighbor) whenever the wall between two cells is removed or
+    put back, and on_refresh() whenever the whole maze changes.
     """
-    for y in range(self.height):
-      for x in range(self.width):
-        if (x, y) == (0, 0) or (x, y) == (self.width-1, self.height-1):
-          self.grid[y][x] = "SPECIAL"
-        elif not (solution_only and self.get_grid((x, y)) == "PATHFIND"):
-          self.grid[y][x] = "VISITED"
+    self.observers.append(observer)
 
-  def draw_maze(self):
+  def remove_observer(self, observer):
     """
-    Displays the maze on screen.
+    Detaches the given observer from the maze.
     """
-    for y in range(self.height):
-      for x in range(self.width):
-        self.draw_cell((x, y))
-        self.draw_walls((x, y))
+    self.observers.remove(observer)
 
-  def draw_cell(self, cell):
+  def set_state(self, grid, path):
     """
-    Displays the given tuple cell on screen.
+    Replaces the state and walls of every cell with the given bytes-like grid and
+    path, which must match the maze size.
     """
-    x, y = cell
-    val = self.get_grid(cell)
-    cell_x = self.start_x + (x * (TILE_SIZE + WALL_SIZE))
-    cell_y = self.start_y + (y * (TILE_SIZE + WALL_SIZE))
-    pygame.draw.rect(self.screen, STAGES[val], (cell_x, cell_y, TILE_SIZE, TILE_SIZE))
+    self.grid[:] = grid
+    self.path[:] = path
+    for observer in self.observers:
+      observer.on_refresh()
 
-  def draw_walls(self, cell):
+  def restore_maze(self, solution_only=False):
     """
-    Draws the walls of a given tuple cell on screen.
+    Resets all PROCESSED cells to VISITED. If given boolean solution_only is False,
+    resets all PATHFIND cells to VISITED as well. Used for solving display. Blocks of
+    cells that do not change are not written, so untouched memory stays untouched.
+    """
+    table = RESTORE_TABLE if solution_only else CLEAR_TABLE
+    for start in range(0, self.total, BLOCK_SIZE):
+      block = self.grid[start : start + BLOCK_SIZE]
+      restored = block.translate(table)
+      if restored != block:
+        self.grid[start : start + len(block)] = restored
+    self.grid[self.get_number(self.start)] = SPECIAL
+    self.grid[self.get_number(self.end)] = SPECIAL
+    for observer in self.observers:
+      observer.on_refresh()
+
+  def visit(self, cell, val):
     """
-    x, y = cell
-    cell_x = self.start_x + (x * (TILE_SIZE + WALL_SIZE))
-    cell_y = self.start_y + (y * (TILE_SIZE + WALL_SIZE))
-    for wall in self.path[y][x]:
-      x2, y2 = wall
-      curr = self.get_grid(cell)
-      neighbor = self.get_grid(wall)
-      color = STAGES[neighbor]
-      if curr == "SPECIAL" or curr == "PATHFIND":
-        if neighbor == "SPECIAL" or neighbor == "PATHFIND":
-          color = STAGES["PATHFIND"]
-      elif neighbor == "SPECIAL" or neighbor == "PATHFIND":
-        color = STAGES[curr]
-      if x2 > x:
-        pygame.draw.rect(self.screen, color, ((cell_x + TILE_SIZE, cell_y), ROW_WALL))
-      elif x2 < x:
-        pygame.draw.rect(self.screen, color, ((cell_x - WALL_SIZE, cell_y), ROW_WALL))
-      if y2 > y:
-        pygame.draw.rect(self.screen, color, ((cell_x, cell_y + TILE_SIZE), COL_WALL))
-      elif y2 < y:
-        pygame.draw.rect(self.screen, color, ((cell_x, cell_y - WALL_SIZE), COL_WALL))
-
-  def visit(self, cell, val, delay):
-    """
-    Takes in a given tuple cell and sets its string grid value to val. Draws the cell and waits
-    delay ms.
+    Takes in a given tuple cell and sets its int grid state to val. Notifies all
+    observers so they can display the change. Every algorithm visits a cell each
+    step, so this is where a cancelled job stops.
     """
+    if self.token is not None and self.token.cancelled:
+      raise Cancelled()
     x, y = cell
-    self.grid[y][x] = val
-    self.draw_cell(cell)
-    self.draw_walls(cell)
-    pygame.time.wait(delay)
+    cell_num = (self.width * y) + x
+    if self.stats is not None:
+      self.stats.record_visit(self.grid[cell_num], val)
+    self.grid[cell_num] = val
+    for observer in self.observers:
+      observer.on_visit(cell, val)
 
   def create_all_walls(self):
     """
-    Creates and returns a list of all walls in the maze.
+    Creates and returns an int array of all walls in the maze. A wall is twice the
+    number of the cell left of or above it, plus one if the wall is below that cell.
     """
-    walls = []
+    walls = array('i')
     for y in range(self.height):
-      for x in range(self.width):
-        if x != self.width-1:
-          walls.append([(x, y), (x+1, y)])
-        if y != self.height-1:
-          walls.append([(x, y), (x, y+1)])
+      row = 2 * self.width * y
+      walls.extend(range(row, row + 2 * (self.width - 1), 2))
+      if y != self.height-1:
+        walls.extend(range(row + 1, row + 2 * self.width, 2))
     return walls
 
-  def remove_wall(self, walls, u, v):
+  def get_wall_cells(self, wall):
     """
-    Takes in a list of walls and two tuple cells and removes the wall from the list.
+    Takes in an int wall and returns the tuple cells on both sides of it.
     """
-    x1, y1 = u
-    x2, y2 = v
-    walls[y1][x1].remove(v)
-    walls[y2][x2].remove(u)
+    cell_num, is_below = divmod(wall, 2)
+    x, y = self.get_cell(cell_num)
+    if is_below:
+      return (x, y), (x, y+1)
+    return (x, y), (x+1, y)
 
   def find(self, parent, i):
     """
-    Finds and returns the parent node of int i in given parent disjoint set.
+    Finds and returns the parent node of int i in given parent disjoint set. Halves
+    the path to the parent node along the way so later finds are near constant time.
     """
+    if self.stats is not None:
+      self.stats.finds += 1
     while parent[i] >= 0:
+      grandparent = parent[parent[i]]
+      if grandparent >= 0:
+        parent[i] = grandparent
       i = parent[i]
     return i
 
   def union(self, parent, a, b):
     """
     Takes in the parent disjoint set and combines both sets of int nodes a and b.
+    Roots hold the negative size of their set, and the smaller set is put under the
+    larger one. Returns whether they were in different sets.
     """
     parent_a = self.find(parent, a)
-    weight_a = parent[parent_a]
     parent_b = self.find(parent, b)
+    if parent_a == parent_b:
+      return False
+    if self.stats is not None:
+      self.stats.unions += 1
+    weight_a = parent[parent_a]
     weight_b = parent[parent_b]
-    if weight_a < weight_b:
-      parent[parent_a] = parent_b
-      parent[parent_b] = weight_a + weight_b
-    else:
+    if weight_a <= weight_b:
       parent[parent_b] = parent_a
       parent[parent_a] = weight_a + weight_b
+    else:
+      parent[parent_a] = parent_b
+      parent[parent_b] = weight_a + weight_b
+    return True
 
   def is_same_set(self, parent, a, b):
     """
@@ -174,6 +219,18 @@ class Maze:
     """
     return self.find(parent, a) == self.find(parent, b)
 
+  def remove_indexed(self, numbers, positions, number):
+    """
+    Takes in an int array of cell numbers, an int array positions holding the index
+    of each cell number in it, and removes the int number from the array in
+    constant time by moving the last cell number into its place.
+    """
+    i = positions[number]
+    last = numbers.pop()
+    if last != number:
+      numbers[i] = last
+      positions[last] = i
+
   def get_neighbors(self, cell):
     """
     Takes in a tuple cell and returns a list of neighbors of the cell, ignoring walls.
@@ -194,38 +251,76 @@ class Maze:
     """
     Takes in a tuple cell and returns a list of visited neighbors of the cell, ignoring walls.
     """
-    neighbors = filter(lambda neighbor: self.get_grid(neighbor) == "VISITED", self.get_neighbors(cell))
+    neighbors = filter(lambda neighbor: self.get_grid(neighbor) == VISITED, self.get_neighbors(cell))
     return list(neighbors)
 
   def get_unvisited_neighbors(self, cell):
     """
     Takes in a tuple cell and returns a list of unvisited neighbors of the cell, ignoring walls.
     """
-    neighbors = filter(lambda neighbor: self.get_grid(neighbor) == "UNVISITED", self.get_neighbors(cell))
+    neighbors = filter(lambda neighbor: self.get_grid(neighbor) == UNVISITED, self.get_neighbors(cell))
     return list(neighbors)
 
   def connect(self, cell, neighbor):
     """
     Takes in two tuple cells and connects them in the maze.
     """
+    cell_num, cell_bit, neighbor_num, neighbor_bit = self.get_wall_bits(cell, neighbor)
+    self.path[cell_num] |= cell_bit
+    self.path[neighbor_num] |= neighbor_bit
+    for observer in self.observers:
+      observer.on_connect(cell, neighbor)
+
+  def disconnect(self, cell, neighbor):
+    """
+    Takes in two tuple cells and puts the wall between them back in the maze.
+    """
+    cell_num, cell_bit, neighbor_num, neighbor_bit = self.get_wall_bits(cell, neighbor)
+    self.path[cell_num] &= ~cell_bit
+    self.path[neighbor_num] &= ~neighbor_bit
+    for observer in self.observers:
+      observer.on_disconnect(cell, neighbor)
+
+  def get_wall_bits(self, cell, neighbor):
+    """
+    Helper method for connect and disconnect. Takes in two adjacent tuple cells and
+    returns the int number and open-wall bit of the wall on each side.
+    """
     x1, y1 = cell
     x2, y2 = neighbor
-    self.path[y1][x1].append(neighbor)
-    self.path[y2][x2].append(cell)
+    cell_num = (self.width * y1) + x1
+    neighbor_num = (self.width * y2) + x2
+    if x2 > x1:
+      return cell_num, EAST, neighbor_num, WEST
+    elif x2 < x1:
+      return cell_num, WEST, neighbor_num, EAST
+    elif y2 > y1:
+      return cell_num, SOUTH, neighbor_num, NORTH
+    return cell_num, NORTH, neighbor_num, SOUTH
 
   def get_grid(self, cell):
     """
-    Returns the string grid value of the given tuple cell.
+    Returns the int state of the given tuple cell.
     """
     x, y = cell
-    return self.grid[y][x]
+    return self.grid[(self.width * y) + x]
 
   def get_path(self, cell):
     """
-    Returns the path list of the given tuple cell.
+    Returns a list of the tuple cells connected to the given tuple cell.
     """
     x, y = cell
-    return self.path[y][x]
+    walls = self.path[(self.width * y) + x]
+    path = []
+    if walls & NORTH:
+      path.append((x, y-1))
+    if walls & EAST:
+      path.append((x+1, y))
+    if walls & SOUTH:
+      path.append((x, y+1))
+    if walls & WEST:
+      path.append((x-1, y))
+    return path
 
   def get_number(self, cell):
     """
@@ -234,70 +329,192 @@ class Maze:
     x, y = cell
     return (self.width * y) + x
 
+  def get_cell(self, number):
+    """
+    Returns the tuple cell of the int number value.
+    """
+    y, x = divmod(number, self.width)
+    return (x, y)
+
   def is_generated(self):
-    for row in self.grid:
-      for col in row:
-        if col != "VISITED" and col != "SPECIAL" and col != "PATHFIND":
-          return False
-    return True
+    """
+    Returns whether every cell has been added to the maze.
+    """
+    return self.grid.find(bytes([UNVISITED])) == -1 and self.grid.find(bytes([PROCESSED])) == -1
+
+  def save(self, file_path):
+    """
+    Saves the maze to the binary maze file at string file_path. See mazefile.py.
+    """
+    with open(file_path, "wb") as file:
+      write_maze(file, self.width, self.height, self.path, self.start, self.end, self.algorithm, self.seed)
+
+  @classmethod
+  def load(cls, file_path):
+    """
+    Loads and returns the maze saved at string file_path. The file is memory-mapped,
+    and the cell states start as zero-filled memory, so only the cells that are
+    used get read.
+    """
+    header, path = map_maze(file_path)
+    maze = cls(0, 0)
+    maze.reset_maze(header["width"], header["height"], mmap.mmap(-1, len(path)), path)
+    maze.start = header["start"]
+    maze.end = header["end"]
+    maze.algorithm = header["algorithm"]
+    maze.seed = header["seed"]
+    maze.grid[maze.get_number(maze.start)] = SPECIAL
+    maze.grid[maze.get_number(maze.end)] = SPECIAL
+    return maze
 
-  def generate(self, algorithm, delay):
-    """
-    Acts as the generation manager. Takes in a string algorithm and int delay
-    and uses that generation algorithm to create the maze with delay ms.
-    """
-    self.reset_maze(self.width, self.height, self.screen)
-    if algorithm == "DFS":
-      self.generate_dfs(delay)
-    elif algorithm == "Kruskal":
-      self.generate_kruskal(delay)
-    elif algorithm == "Prim":
-      self.generate_prim(delay)
-    elif algorithm == "Wilson":
-      self.generate_wilson(delay)
-    elif algorithm == "Eller":
-      self.generate_eller(delay)
-    elif algorithm == "Hunt and Kill":
-      self.generate_hunt_and_kill(delay)
-    x1, y1 = self.start
-    self.grid[y1][x1] = "SPECIAL"
-    x2, y2 = self.end
-    self.grid[y2][x2] = "SPECIAL"
+  def generate(self, algorithm, log=None, seed=None, cache=None, token=None):
+    """
+    Acts as the generation manager. Takes in a string algorithm and uses that
+    generation algorithm to create the maze. If an EventLog log is given, every step
+    is recorded in it. If a seed is given, the same seed always generates the same
+    maze, and a MazeCache cache is used to skip generating mazes it already holds.
+    If the CancelToken token is cancelled, generation stops at the next step and the
+    maze is left empty. Runs every step of generate_steps.
+    """
+    deque(self.generate_steps(algorithm, log, seed, cache, token), maxlen=0)
     return self.path
 
-  def solve(self, algorithm, delay):
+  def generate_steps(self, algorithm, log=None, seed=None, cache=None, token=None):
+    """
+    Takes in the same arguments as generate and returns a generator that generates
+    the maze one step at a time, yielding the tuple cell visited in each step, or
+    None when the whole maze changed at once. Several of these can be advanced in
+    turn from one thread, see round_robin. If the generator is closed before it is
+    done, the maze is left empty.
+    """
+    if log is not None:
+      self.add_observer(log)
+    self.random = random.Random(seed)
+    key = (algorithm, self.width, self.height, seed)
+    path = None
+    if cache is not None and seed is not None:
+      path = cache.get(key)
+    self.reset_maze(self.width, self.height)
+    self.algorithm = algorithm
+    self.seed = seed
+    self.token = token
+    try:
+      if self.stats is not None:
+        self.stats.begin_phase("generate " + algorithm)
+      if path is not None:
+        self.set_state(bytes([VISITED]) * self.total, path)
+        yield None
+      elif algorithm == "DFS":
+        yield from self.generate_dfs()
+      elif algorithm == "Kruskal":
+        yield from self.generate_kruskal()
+      elif algorithm == "Prim":
+        yield from self.generate_prim()
+      elif algorithm == "Wilson":
+        yield from self.generate_wilson()
+      elif algorithm == "Eller":
+        yield from self.generate_eller()
+      elif algorithm == "Hunt and Kill":
+        yield from self.generate_hunt_and_kill()
+      elif algorithm == "Binary Tree":
+        yield from self.generate_binary_tree()
+      elif algorithm == "Sidewinder":
+        yield from self.generate_sidewinder()
+      if self.stats is not None:
+        self.stats.end_phase()
+      if path is None and cache is not None and seed is not None:
+        cache.put(key, self.path)
+      self.visit(self.start, SPECIAL)
+      self.visit(self.end, SPECIAL)
+    except (Cancelled, GeneratorExit) as error:
+      if self.stats is not None and self.stats.phase is not None:
+        self.stats.end_phase()
+      self.reset_maze(self.width, self.height)
+      if isinstance(error, GeneratorExit):
+        raise
+    finally:
+      self.token = None
+      if log is not None:
+        self.remove_observer(log)
+
+  def solve(self, algorithm, log=None, token=None):
+    """
+    Acts as the solution manager. Takes in a string algorithm and uses that solving
+    algorithm to solve the maze. If an EventLog log is given, every step is recorded
+    in it. If the CancelToken token is cancelled, solving stops at the next step and
+    the maze is left unsolved. Runs every step of solve_steps.
+    """
+    deque(self.solve_steps(algorithm, log, token), maxlen=0)
+    return self.solution
+
+  def solve_steps(self, algorithm, log=None, token=None):
     """
-    Acts as the solution manager. Takes in a string algorithm and int delay
-    and uses that solving algorithm to solve the maze with delay ms.
+    Takes in the same arguments as solve and returns a generator that solves the
+    maze one step at a time, yielding the tuple cell visited in each step. If the
+    generator is closed before it is done, the maze is left unsolved.
     """
+    if log is not None:
+      self.add_observer(log)
     self.solution = []
     self.restore_maze()
-    if algorithm == "DFS":
-      self.solve_dfs(delay)
-    elif algorithm == "BFS":
-      self.solve_bfs(delay)
-    elif algorithm == "A*":
-      self.solve_a_star(delay)
-    self.restore_maze(True)
-    return self.solution
+    self.token = token
+    try:
+      if self.stats is not None:
+        self.stats.begin_phase("solve " + algorithm)
+      if algorithm == "DFS":
+        yield from self.solve_dfs()
+      elif algorithm == "BFS":
+        yield from self.solve_bfs()
+      elif algorithm == "A*":
+        yield from self.solve_a_star()
+      elif algorithm == "Bidirectional BFS":
+        yield from self.solve_bidirectional_bfs()
+      if self.stats is not None:
+        self.stats.end_phase()
+    except (Cancelled, GeneratorExit) as error:
+      if self.stats is not None and self.stats.phase is not None:
+        self.stats.end_phase()
+      self.solution = []
+      self.restore_maze()
+      if isinstance(error, GeneratorExit):
+        raise
+    else:
+      self.restore_maze(True)
+    finally:
+      self.token = None
+      if log is not None:
+        self.remove_observer(log)
 
-  def create_solution(self, parents, cell, delay):
+  def create_solution(self, parents, cell, end_parents=None):
     """
     Helper method for all solution algorithms. Takes in a int array parents that
-    stores the previous cell in the path in the current cell. Takes in the final
-    tuple cell. Draws all cells with int delay ms. Returns all the cells in the path
-    as a list.
-    """
-    x, y = cell
-    while parents[y][x] != cell:
-      self.solution.insert(0, cell)
-      if self.get_grid(cell) != "SPECIAL":
-        self.visit(cell, "PATHFIND", min(delay, 50))
-      cell = parents[y][x]
-      x, y = cell
-      self.solution.insert(0, cell)
+    stores the previous cell number in the path at the current cell number. Takes in
+    the final tuple cell. If int array end_parents is given, the path continues from
+    the final cell back to the root of end_parents. Marks every cell of the path.
+    Returns all the cells in the path as a list.
+    """
+    self.solution = self.trace_path(parents, cell)
+    self.solution.reverse()
+    if end_parents is not None:
+      self.solution.extend(self.trace_path(end_parents, cell)[1:])
+    for cell in reversed(self.solution):
+      if self.get_grid(cell) != SPECIAL:
+        self.visit(cell, PATHFIND)
+        yield cell
     return self.solution
 
+  def trace_path(self, parents, cell):
+    """
+    Helper method for create_solution. Takes in a int array parents and a tuple cell
+    and returns the list of tuple cells from that cell back to the root of parents.
+    """
+    cell_num = self.get_number(cell)
+    path = [cell]
+    while parents[cell_num] != cell_num:
+      cell_num = parents[cell_num]
+      path.append(self.get_cell(cell_num))
+    return path
+
   #==============================================================================#
   #                            GENERATION ALGORITHMS                             #
   #==============================================================================#
@@ -312,86 +529,101 @@ class Maze:
     until there is one.
   6) Complete if current cell is starting cell again.
   """
-  def generate_dfs(self, delay):
+  def generate_dfs(self):
     """
-    Generates a maze using depth-first search with int delay ms.
+    Generates a maze using depth-first search.
     """
-    stack = [(randrange(self.width), randrange(self.height))]
+    stack = [(self.random.randrange(self.width), self.random.randrange(self.height))]
     while stack:
       top = stack[-1]
-      if self.get_grid(top) != "PROCESSED":
-        self.visit(top, "PROCESSED", delay)
+      if self.get_grid(top) != PROCESSED:
+        self.visit(top, PROCESSED)
+        yield top
       neighbors = self.get_unvisited_neighbors(top)
       if neighbors:
-        selected = random.choice(neighbors)
+        selected = self.random.choice(neighbors)
         self.connect(top, selected)
         stack.append(selected)
+        if self.stats is not None:
+          self.stats.record_size("stack", len(stack))
       else:
         stack.pop()
-        self.visit(top, "VISITED", delay)
+        self.visit(top, VISITED)
+        yield top
 
   """
   Algorithm:
-  1) Create a list of all walls, and create a disjointed set for each cell
-    containing only that cell.
-  2) Choose a random wall and remove it from the list.
+  1) Create a list of all walls in random order, and create a disjointed set for
+    each cell containing only that cell.
+  2) Take the next wall from the list.
   3) If the two cells adjacent to that wall are from different sets, remove the
     wall and form a path between the two cells. Add them to the maze.
   4) Repeat 2-3 until all cells are in the same set.
   Note that if the two cells adjacent to the wall are from the same set, it skips
-    that wall.
+    that wall. Counting the sets left keeps step 4 constant time.
   """
-  def generate_kruskal(self, delay):
+  def generate_kruskal(self):
     """
-    Generates a maze using randomized kruskal's algorithm with int delay ms.
+    Generates a maze using randomized kruskal's algorithm.
     """
     walls = self.create_all_walls()
-    disjoint_set = [-1 for i in range(self.total)]
-    while -self.total not in disjoint_set:
-      wall = random.choice(walls)
-      walls.remove(wall)
-      cell, selected = wall
+    self.random.shuffle(walls)
+    disjoint_set = array('i', [-1]) * self.total
+    components = self.total
+    for wall in walls:
+      if components == 1:
+        break
+      cell, selected = self.get_wall_cells(wall)
       cell_num = self.get_number(cell)
       selected_num = self.get_number(selected)
-      if not self.is_same_set(disjoint_set, cell_num, selected_num):
-        self.union(disjoint_set, cell_num, selected_num)
+      if self.union(disjoint_set, cell_num, selected_num):
+        components -= 1
         self.connect(cell, selected)
-        self.visit(cell, "PROCESSED", delay)
-        self.visit(cell, "VISITED", 0)
-        self.visit(selected, "VISITED", delay)
+        self.visit(cell, PROCESSED)
+        yield cell
+        self.visit(cell, VISITED)
+        yield cell
+        self.visit(selected, VISITED)
+        yield selected
 
   """
   Algorithm:
   1) Pick a random starting cell as current cell. Add it to the maze.
-  2) For every wall between the current cell and an unvisited neighbor, add the
-    wall to the list.
-  3) Choose a random wall from the list and remove it. If the seocnd cell has not been
-    visited, form a path between the two and add the second cell to the maze.
+  2) Add every unvisited neighbor of the current cell to the frontier, unless it is
+    already in the frontier.
+  3) Choose a random cell from the frontier and remove it by swapping it with the
+    last cell. Form a path between it and a random visited neighbor and add it to
+    the maze.
   4) Set the current cell to the new cell.
-  5) Repeat 2-4 until there are no more walls.
+  5) Repeat 2-4 until the frontier is empty.
   """
-  def generate_prim(self, delay):
-    """
-    Generates a maze using randomized prim's algorithm with int delay ms.
-    """
-    start = (randrange(self.width), randrange(self.height))
-    self.visit(start, "PROCESSED", delay)
-    self.visit(start, "VISITED", delay)
-    neighbors = self.get_unvisited_neighbors(start)
-    walls = []
-    for neighbor in neighbors:
-      walls.append([start, neighbor])
-    while walls:
-      wall = random.choice(walls)
-      cell, selected = wall
-      walls.remove(wall)
-      if self.get_grid(selected) != "VISITED":
-        self.connect(cell, selected)
-        self.visit(selected, "PROCESSED", delay)
-        self.visit(selected, "VISITED", 0)
-        neighbors = self.get_unvisited_neighbors(selected)
-        for neighbor in neighbors:
-          walls.append([selected, neighbor])
+  def generate_prim(self):
+    """
+    Generates a maze using randomized prim's algorithm. Frontier cells are marked
+    PROCESSED, which keeps each of them in the frontier only once.
+    """
+    cell = (self.random.randrange(self.width), self.random.randrange(self.height))
+    self.visit(cell, PROCESSED)
+    yield cell
+    self.visit(cell, VISITED)
+    yield cell
+    frontier = []
+    while True:
+      for neighbor in self.get_unvisited_neighbors(cell):
+        self.visit(neighbor, PROCESSED)
+        yield neighbor
+        frontier.append(neighbor)
+      if self.stats is not None:
+        self.stats.record_size("frontier", len(frontier))
+      if not frontier:
+        break
+      i = self.random.randrange(len(frontier))
+      frontier[i], frontier[-1] = frontier[-1], frontier[i]
+      cell = frontier.pop()
+      selected = self.random.choice(self.get_visited_neighbors(cell))
+      self.connect(selected, cell)
+      self.visit(cell, VISITED)
+      yield cell
 
   """
   Algorithm:
@@ -402,35 +634,51 @@ class Maze:
   5) If collided with its own path, remove the looped path and continue back at 3.
   6) If collided with a visited cell, form a path of all the cells and add them to
     the maze. Repeat 2-5 until maze is fully generated.
+  Note that unvisited cells are kept in an array with their positions so that step 2
+    and adding a cell to the maze are constant time, and each walked cell maps to its
+    position in the walk so that step 5 only touches the removed loop.
   """
-  def generate_wilson(self, delay):
-    """
-    Generates a maze using wilson's algorithm with int delay ms.
-    """
-    self.visit((randrange(self.width), randrange(self.height)), "VISITED", delay)
-    while not self.is_generated():
-      stack = []
-      start = (randrange(self.width), randrange(self.height))
-      while self.get_grid(start) != "UNVISITED":
-        start = (randrange(self.width), randrange(self.height))
-      stack.append(start)
-      self.visit(start, "PROCESSED", delay)
-      while stack and self.get_grid(stack[-1]) != "VISITED":
-        top = stack[-1]
-        neighbors = self.get_neighbors(top)
-        selected = random.choice(neighbors)
-        if self.get_grid(selected) != "VISITED":
-          self.visit(selected, "PROCESSED", delay)
-        if selected in stack:
-          while selected in stack and len(stack) > 1:
-            self.visit(stack.pop(), "UNVISITED", 0)
+  def generate_wilson(self):
+    """
+    Generates a maze using wilson's algorithm.
+    """
+    unvisited = array('i', range(self.total))
+    positions = array('i', unvisited)
+    first = self.random.randrange(self.total)
+    self.remove_indexed(unvisited, positions, first)
+    cell = self.get_cell(first)
+    self.visit(cell, VISITED)
+    yield cell
+    while unvisited:
+      start = self.get_cell(unvisited[self.random.randrange(len(unvisited))])
+      stack = [start]
+      walk = {start: 0}
+      self.visit(start, PROCESSED)
+      yield start
+      while self.get_grid(stack[-1]) != VISITED:
+        selected = self.random.choice(self.get_neighbors(stack[-1]))
+        if selected in walk:
+          loop = walk[selected] + 1
+          while len(stack) > loop:
+            cell = stack.pop()
+            del walk[cell]
+            self.visit(cell, UNVISITED)
+            yield cell
         else:
+          if self.get_grid(selected) != VISITED:
+            self.visit(selected, PROCESSED)
+            yield selected
+          walk[selected] = len(stack)
           stack.append(selected)
+          if self.stats is not None:
+            self.stats.record_size("walk", len(stack))
       while len(stack) > 1:
         top = stack.pop()
         next = stack[-1]
         self.connect(top, next)
-        self.visit(next, "VISITED", delay)
+        self.visit(next, VISITED)
+        yield next
+        self.remove_indexed(unvisited, positions, self.get_number(next))
 
   """
   Algorithm:
@@ -439,121 +687,143 @@ class Maze:
   2) For each cell in the row besides the last, if the cell to the right is not
     in the same disjoint set, randomly decide whether to combine disjoint sets and form
     a path between them. If so, add them to the maze.
-  3) For each cell in the row, if it is the parent of the disjoint set, or randomly,
-    combine disjoint sets with the cell below and form a path between them. If so,
-    add them to the maze.
-  4) Repeat 1-3 with rows being added below the previous.
+  3) For each disjoint set in the row, randomly choose at least one of its cells to
+    form a path with the cell below. The cells below stay in that disjoint set.
+  4) Repeat 1-3 with rows being added below the previous. Cells below that were not
+    joined get new disjoint sets.
   5) On the final row, repeat 2, except if they are not in the same disjoint set,
     they must form a path between them. Add them to the maze.
+  Note that only the disjoint sets of the current row are kept, so each row is
+    finished before the next one starts. See stream_eller.
   """
-  def generate_eller(self, delay):
-    """
-    Generates a maze using eller's algorithm with int delay ms.
-    """
-    self.ellers(0, [-1 for i in range(self.total)], delay)
-
-  def ellers(self, row, disjoint_set, delay):
-    """
-    Helper method for generate_eller. Processes the given int row using int array
-    disjoint_set and int delay. Will process all rows.
-    """
-    if row == self.height - 1:
-      self.ellers_row_operation(row, disjoint_set, delay)
-    elif row < self.height - 1:
-      self.ellers_row_operation(row, disjoint_set, delay, True)
-      for i in range(self.width):
-        cell_num = (row * self.width) + i
-        cell_set = disjoint_set[cell_num]
-        if cell_set < 0 or getrandbits(1):
-          self.union(disjoint_set, cell_num + self.width, cell_num)
-          self.connect((i, row), (i, row+1))
-        self.visit((i, row+1), "PROCESSED", delay)
-      self.ellers(row+1, disjoint_set, delay)
-
-  def ellers_row_operation(self, row, disjoint_set, delay, is_random=False):
-    """
-    Helper method for ellers. Processes each cell in given row using int array
-    disjoint_set and int delay. Connects cells to the right if they are not in the
-    same disjoint set. If is_random is True, then will randomly choose when to
-    connect cell to the right.
-    """
-    for i in range(self.width - 1):
-      self.visit((i, row), "VISITED", delay)
-      self.visit((i+1, row), "VISITED", 0)
-      cell_num = (row * self.width) + i
-      rand = getrandbits(1) if is_random else 1
-      if rand and not self.is_same_set(disjoint_set, cell_num, cell_num+1):
-        self.connect((i, row), (i+1, row))
-        self.union(disjoint_set, cell_num, cell_num+1)
-        self.visit((i, row), "VISITED", delay)
+  def generate_eller(self):
+    """
+    Generates a maze using eller's algorithm.
+    """
+    for y, row in enumerate(stream_eller(self.width, self.height, self.random)):
+      for x in range(self.width):
+        cell = (x, y)
+        if row[x] & EAST:
+          self.connect(cell, (x+1, y))
+        if row[x] & SOUTH:
+          self.connect(cell, (x, y+1))
+        self.visit(cell, VISITED)
+        yield cell
 
   """
   Algorithm:
   1) Choose a random starting cell as current cell. Add it to the maze.
   2) Choose a random unvisited neighbor cell of the current cell. Add it to the maze.
   3) Repeat 2 until there is no longer any unvisited neighbor cells.
-  4) Scan each row for a cell that has a visited neighbor cell. If so, add it to
-    the maze. Set the current cell as that cell.
+  4) Find the first row with an unvisited cell that has a visited neighbor cell. Add
+    it to the maze. Set the current cell as that cell.
   5) Repeat 2-4 until maze is fully generated.
+  Note that a count of unvisited cells per row and a set per row of unvisited cells
+    next to visited cells are kept up to date, so step 4 jumps straight to a cell
+    instead of scanning the grid.
   """
-  def generate_hunt_and_kill(self, delay):
+  def generate_hunt_and_kill(self):
     """
-    Generates a maze using hunt and kill algorithm with int delay ms.
+    Generates a maze using hunt and kill algorithm.
     """
-    cell = (randrange(self.width), randrange(self.height))
-    self.visit(cell, "VISITED", delay)
+    row_unvisited = array('i', [self.width]) * self.height
+    frontier = [set() for y in range(self.height)]
+    cell = (self.random.randrange(self.width), self.random.randrange(self.height))
+    yield from self.hunt_and_kill_visit(cell, row_unvisited, frontier)
     min_row = 0
-    while not self.is_generated():
-      self.kill(cell, delay)
-      cell = self.hunt(min_row, delay)
-      min_row = self.hunt_get_min_row(min_row)
+    while True:
+      yield from self.kill(cell, row_unvisited, frontier)
+      while min_row < self.height and row_unvisited[min_row] == 0:
+        min_row += 1
+      if min_row == self.height:
+        break
+      cell = yield from self.hunt(min_row, row_unvisited, frontier)
 
-  def hunt(self, min_row, delay):
+  def hunt_and_kill_visit(self, cell, row_unvisited, frontier):
     """
-    Scans each row for an unvisited tuple cell that has a visited neighbor tuple cell.
-    Returns that unvisited cell.
+    Helper method for generate_hunt_and_kill. Adds the tuple cell to the maze and updates
+    the int array row_unvisited of unvisited cells per row and the list frontier of
+    sets of unvisited x values next to visited cells per row.
     """
-    for y in range(min_row, self.height):
-      for x in range(self.width):
-        cell = (x, y)
-        prev_state = self.get_grid(cell)
-        self.visit(cell, "PROCESSED", delay)
-        visited_neighbors = self.get_visited_neighbors(cell)
-        if prev_state != "VISITED" and visited_neighbors:
-          selected = random.choice(visited_neighbors)
-          self.connect(cell, selected)
-          self.visit(cell, "VISITED", delay)
-          return cell
-        else:
-          self.visit(cell, prev_state, delay)
-    return (0, 0)
+    x, y = cell
+    self.visit(cell, VISITED)
+    yield cell
+    row_unvisited[y] -= 1
+    frontier[y].discard(x)
+    for x2, y2 in self.get_unvisited_neighbors(cell):
+      frontier[y2].add(x2)
+
+  def hunt(self, min_row, row_unvisited, frontier):
+    """
+    Finds an unvisited tuple cell that has a visited neighbor tuple cell in the first
+    row at or after int min_row that has one. Connects them and returns that cell.
+    """
+    y = min_row
+    while not frontier[y]:
+      y += 1
+    cell = (next(iter(frontier[y])), y)
+    self.visit(cell, PROCESSED)
+    yield cell
+    selected = self.random.choice(self.get_visited_neighbors(cell))
+    self.connect(cell, selected)
+    yield from self.hunt_and_kill_visit(cell, row_unvisited, frontier)
+    return cell
 
-  def kill(self, cell, delay):
+  def kill(self, cell, row_unvisited, frontier):
     """
     Takes in a tuple cell and chooses a random unvisited neighbor tuple cell. Marks
     the neighbor cell as visited. Repeats with cell as the new neighbor cell until
-    there are no longer any neighbor cells. Draws with int delay ms.
+    there are no longer any neighbor cells.
     """
     neighbors = self.get_unvisited_neighbors(cell)
-    if neighbors:
-      selected = random.choice(neighbors)
+    while neighbors:
+      selected = self.random.choice(neighbors)
       self.connect(cell, selected)
-      self.visit(selected, "PROCESSED", delay)
-      self.visit(selected, "VISITED", delay)
-      self.kill(selected, delay)
+      self.visit(selected, PROCESSED)
+      yield selected
+      yield from self.hunt_and_kill_visit(selected, row_unvisited, frontier)
+      cell = selected
+      neighbors = self.get_unvisited_neighbors(cell)
 
-  def hunt_get_min_row(self, min_row):
+  """
+  Algorithm:
+  1) For each cell, randomly form a path with the cell above or the cell to the
+    right. Cells on the top row always go right and cells on the right column always
+    go up.
+  Note that every cell is carved at once with NumPy, see vectorized.py.
+  """
+  def generate_binary_tree(self):
     """
-    Optimizing helper for generate_hunt_and_kill. Takes in the minimum int row that
-    still might have an unvisited cell and returns the true minimum int row that
-    still has an unvisited cell.
+    Generates a maze using the binary tree algorithm. The whole maze appears at once.
     """
-    for y in range(min_row, self.height):
-      for x in range(self.width):
-        if self.get_grid((x, y)) != "VISITED":
-          return min_row
-      min_row = min_row + 1
-    return min_row
+    from vectorized import carve_binary_tree
+    carve_binary_tree(self.path, self.width, self.height, self.get_numpy_random())
+    self.set_state(bytes([VISITED]) * self.total, self.path)
+    yield None
+
+  """
+  Algorithm:
+  1) Form a path along the whole top row.
+  2) For each other row, group the cells into runs of random length. Form paths
+    between the cells of a run and a path up from one random cell of each run.
+  Note that every row is carved at once with NumPy, see vectorized.py.
+  """
+  def generate_sidewinder(self):
+    """
+    Generates a maze using the sidewinder algorithm. The whole maze appears at once.
+    """
+    from vectorized import carve_sidewinder
+    carve_sidewinder(self.path, self.width, self.height, self.get_numpy_random())
+    self.set_state(bytes([VISITED]) * self.total, self.path)
+    yield None
+
+  def get_numpy_random(self):
+    """
+    Helper method for the NumPy generators. Returns a NumPy Generator seeded from the
+    maze's random numbers, so seeded mazes stay reproducible.
+    """
+    import numpy as np
+    return np.random.default_rng(self.random.getrandbits(64))
 
   #==============================================================================#
   #                             SOLVING ALGORITHMS                               #
@@ -562,37 +832,39 @@ class Maze:
   """
   Algorithm:
   1) Pick the starting cell as current cell.
-  2) Pick a random path cell of that current cell.
+  2) Pick a random path cell of that current cell that is not closed.
   3) Mark the random path cell as processed.
   4) Repeat 2-3 with the neighbor cell as the new current cell.
   5) If there are no visited path cells, backtrack the current cells
     until there is one.
   6) Complete if current cell is the end cell.
   """
-  def solve_dfs(self, delay):
+  def solve_dfs(self):
     """
-    Solves the maze using depth-first search algorithm with int delay ms.
+    Solves the maze using depth-first search algorithm.
     """
-    parents = [[(-1, -1) for x in range(self.width)] for y in range(self.height)]
+    parents = array('i', [-1]) * self.total
+    closed = bytearray(self.total)
     stack = [self.start]
-    closed = []
-    cell = stack[0]
-    x, y = cell
-    parents[y][x] = cell
+    start_num = self.get_number(self.start)
+    parents[start_num] = start_num
     while stack:
       cell = stack[-1]
-      if self.get_grid(cell) != "SPECIAL":
-        self.visit(cell, "PROCESSED", delay)
+      cell_num = self.get_number(cell)
+      if self.get_grid(cell) != SPECIAL:
+        self.visit(cell, PROCESSED)
+        yield cell
       if cell == self.end:
-        return self.create_solution(parents, cell, delay)
-      closed.append(cell)
-      path = self.get_path(cell)
-      neighbors = [neighbor for neighbor in path if not neighbor in closed]
+        yield from self.create_solution(parents, cell)
+        return self.solution
+      closed[cell_num] = 1
+      neighbors = [neighbor for neighbor in self.get_path(cell) if not closed[self.get_number(neighbor)]]
       if neighbors:
-        selected = random.choice(neighbors)
-        x2, y2 = selected
-        parents[y2][x2] = cell
+        selected = self.random.choice(neighbors)
+        parents[self.get_number(selected)] = cell_num
         stack.append(selected)
+        if self.stats is not None:
+          self.stats.record_size("stack", len(stack))
       else:
         stack.pop()
     return self.solution
@@ -604,78 +876,205 @@ class Maze:
   3) Set the current cell as the next item in queue. Mark it as processed.
   4) Repeat 2-3 until current cell is the end cell.
   """
-  def solve_bfs(self, delay):
+  def solve_bfs(self):
     """
-    Solves the maze using breadth-first search algorithm with int delay ms.
+    Solves the maze using breadth-first search algorithm.
     """
-    parents = [[(-1, -1) for x in range(self.width)] for y in range(self.height)]
-    queue = [self.start]
-    cell = queue[0]
-    x, y = cell
-    parents[y][x] = cell
+    parents = array('i', [-1]) * self.total
+    queue = deque([self.start])
+    start_num = self.get_number(self.start)
+    parents[start_num] = start_num
     while queue:
-      cell = queue.pop(0)
-      if self.get_grid(cell) != "SPECIAL":
-        self.visit(cell, "PROCESSED", delay)
+      cell = queue.popleft()
+      if self.get_grid(cell) != SPECIAL:
+        self.visit(cell, PROCESSED)
+        yield cell
       if cell == self.end:
-        return self.create_solution(parents, cell, delay)
-      else:
-        neighbors = self.get_path(cell)
-        for neighbor in neighbors:
-          x2, y2 = neighbor
-          if parents[y2][x2] == (-1, -1):
-            parents[y2][x2] = cell
-            queue.append(neighbor)
+        yield from self.create_solution(parents, cell)
+        return self.solution
+      self.expand_bfs(cell, queue, parents)
+    return self.solution
+
+  def expand_bfs(self, cell, queue, parents):
+    """
+    Helper method for the breadth-first search algorithms. Adds every path cell of
+    the tuple cell that is not in int array parents yet to the queue, with the cell
+    as its parent.
+    """
+    cell_num = self.get_number(cell)
+    for neighbor in self.get_path(cell):
+      neighbor_num = self.get_number(neighbor)
+      if parents[neighbor_num] == -1:
+        parents[neighbor_num] = cell_num
+        queue.append(neighbor)
+    if self.stats is not None:
+      self.stats.record_size("queue", len(queue))
+
+  """
+  Algorithm:
+  1) Add the starting cell to one queue and the ending cell to another.
+  2) Take the next cell from the starting queue. Mark it as processed. Add all of its
+    path cells to the starting queue.
+  3) Do the same for the ending queue.
+  4) Repeat 2-3 until a cell taken from one queue was already reached from the other.
+    The path goes from the start to that cell and from that cell to the end.
+  """
+  def solve_bidirectional_bfs(self):
+    """
+    Solves the maze using breadth-first search from both the start and the end.
+    """
+    start_parents = array('i', [-1]) * self.total
+    end_parents = array('i', [-1]) * self.total
+    start_num = self.get_number(self.start)
+    end_num = self.get_number(self.end)
+    start_parents[start_num] = start_num
+    end_parents[end_num] = end_num
+    start_queue = deque([self.start])
+    end_queue = deque([self.end])
+    while start_queue and end_queue:
+      for queue, parents, other_parents in ((start_queue, start_parents, end_parents),
+                                            (end_queue, end_parents, start_parents)):
+        cell = queue.popleft()
+        if self.get_grid(cell) != SPECIAL:
+          self.visit(cell, PROCESSED)
+          yield cell
+        if other_parents[self.get_number(cell)] != -1:
+          yield from self.create_solution(start_parents, cell, end_parents)
+          return self.solution
+        self.expand_bfs(cell, queue, parents)
     return self.solution
 
   """
   1) Pick the starting cell as the current cell.
-  2) Calculate the heuristic costs of all path cells of the current cell and add it to
-    the heap if the path cell is not in the closed list or in the heap.
-  3) Remove the first item from the heap. Set the current cell to it.
-    Mark it as processed. Add it to the closed list.
+  2) For each path cell of the current cell, compute its cost from the start as one
+    more than the current cell's, and its heuristic cost to the end. If that is
+    cheaper than any cost found for it before, add it to the heap.
+  3) Remove the first item from the heap. Skip it if it is already closed. Set the
+    current cell to it. Mark it as processed. Close it.
   4) Repeat 2-3 until current cell is the end cell.
   """
-  def solve_a_star(self, delay):
+  def solve_a_star(self):
     """
-    Solves the maze using A* algorithm with int delay ms.
+    Solves the maze using A* algorithm.
     """
-    costs = [[[-1, -1, -1] for x in range(self.width)] for y in range(self.height)]
-    parents = [[(-1, -1) for x in range(self.width)] for y in range(self.height)]
+    parents = array('i', [-1]) * self.total
+    g_costs = array('i', [self.total]) * self.total
+    closed = bytearray(self.total)
     open = []
-    closed = []
-    cell = self.start
-    x, y = cell
-    costs[y][x] = self.compute_a_costs(cell)
-    parents[y][x] = cell
-    heapq.heappush(open, (0, 0, cell))
+    start_num = self.get_number(self.start)
+    parents[start_num] = start_num
+    g_costs[start_num] = 0
+    g, h, f = self.compute_a_costs(self.start, 0)
+    heapq.heappush(open, (f, h, start_num))
     while open:
-      cell = heapq.heappop(open)[2]
-      closed.append(cell)
-      if self.get_grid(cell) != "SPECIAL":
-        self.visit(cell, "PROCESSED", delay)
+      cell_num = heapq.heappop(open)[2]
+      if closed[cell_num]:
+        continue
+      closed[cell_num] = 1
+      cell = self.get_cell(cell_num)
+      if self.get_grid(cell) != SPECIAL:
+        self.visit(cell, PROCESSED)
+        yield cell
       if cell == self.end:
-        return self.create_solution(parents, cell, delay)
-      neighbors = self.get_path(cell)
-      for neighbor in neighbors:
-        if not neighbor in closed and not neighbor in open:
-          x2, y2 = neighbor
-          neighbor_costs = self.compute_a_costs(neighbor)
-          costs[y2][x2] = neighbor_costs
-          parents[y2][x2] = cell
-          if not neighbor in open:
-            heapq.heappush(open, (neighbor_costs[2], neighbor_costs[1], neighbor))
-
-  def compute_a_costs(self, cell):
-    """
-    Helper method for solve_a_star. Takes in a tuple cell and returns the heuristic
-    costs of that cell with Manhattan distance from the starting tuple cell and the
-    ending tuple cell.
+        yield from self.create_solution(parents, cell)
+        return self.solution
+      for neighbor in self.get_path(cell):
+        neighbor_num = self.get_number(neighbor)
+        g, h, f = self.compute_a_costs(neighbor, g_costs[cell_num] + 1)
+        if not closed[neighbor_num] and g < g_costs[neighbor_num]:
+          g_costs[neighbor_num] = g
+          parents[neighbor_num] = cell_num
+          heapq.heappush(open, (f, h, neighbor_num))
+      if self.stats is not None:
+        self.stats.record_size("heap", len(open))
+    return self.solution
+
+  def compute_a_costs(self, cell, g):
+    """
+    Helper method for solve_a_star. Takes in a tuple cell and its int path cost g
+    from the starting tuple cell, and returns the costs of that cell with the
+    Manhattan distance to the ending tuple cell as the heuristic.
     """
     x, y = cell
-    x_start, y_start = self.start
     x_end, y_end = self.end
-    g = abs(x_start - x) + abs(y_start - y)
     h = abs(x_end - x) + abs(y_end - y)
     f = g + h
-    return [g, h, f]
\ No newline at end of file
+    return [g, h, f]
+
+
+#==============================================================================#
+#                                   STEPPING                                   #
+#==============================================================================#
+
+def round_robin(jobs, steps=1):
+  """
+  Takes in a list of step generators, such as from generate_steps and solve_steps
+  on different mazes, and advances each of them int steps steps in turn from one
+  thread until all of them are done. Yields a tuple (job index, step) for every
+  step. Stopping iteration pauses every job where it is.
+  """
+  running = list(enumerate(jobs))
+  while running:
+    still_running = []
+    for i, job in running:
+      count = 0
+      for step in islice(job, steps):
+        count += 1
+        yield i, step
+      if count == steps:
+        still_running.append((i, job))
+    running = still_running
+
+#==============================================================================#
+#                             STREAMING GENERATION                             #
+#==============================================================================#
+
+def stream_eller(width, height, rng=random):
+  """
+  Generates a maze of int width and int height with eller's algorithm, one row at a
+  time, drawing random numbers from rng. Yields a bytearray of the open-wall bits of
+  each row as soon as it is finished. Only O(width) state is kept, so height can be
+  as large as needed and rows can be written out as they arrive.
+  """
+  sets = list(range(width)) # disjoint set label of each cell in the row
+  below = bytearray(width) # whether each cell of the previous row connects down
+  for y in range(height):
+    row = bytearray(NORTH if down else 0 for down in below)
+    members = {}
+    for x, label in enumerate(sets):
+      members.setdefault(label, []).append(x)
+    is_last = y == height - 1
+    for x in range(width - 1):
+      a = sets[x]
+      b = sets[x+1]
+      if a != b and (is_last or rng.getrandbits(1)):
+        if len(members[a]) < len(members[b]):
+          a, b = b, a
+        for col in members[b]:
+          sets[col] = a
+        members[a].extend(members.pop(b))
+        row[x] |= EAST
+        row[x+1] |= WEST
+    if not is_last:
+      below = bytearray(width)
+      for cols in members.values():
+        down = [col for col in cols if rng.getrandbits(1)]
+        if not down:
+          down = [rng.choice(cols)]
+        for col in down:
+          below[col] = 1
+          row[col] |= SOUTH
+      labels = {}
+      for x in range(width):
+        if below[x]:
+          sets[x] = labels.setdefault(sets[x], len(labels))
+      label = len(labels)
+      for x in range(width):
+        if not below[x]:
+          sets[x] = label
+          label += 1
+    yield row
+
+if __name__ == "__main__":
+  import batch
+  batch.main()
@@ -0,0 +1,155 @@
+#==============================================================================#
+# mazefile.py reads and writes the binary maze file format. created by Andy    #
+# Phan.                                                                        #
+#==============================================================================#
+
+import mmap
+import struct
+
+"""
+File format, all little-endian:
+1) Header of HEADER.size bytes: magic b"MAZE", int version, int flags (bit 0 set
+  if the maze has a seed), int width, int height, int seed, int start x, int
+  start y, int end x, int end y, and the generation algorithm as 32 utf-8 bytes.
+2) Walls packed 4 bits per cell, two cells per byte. The even cell number is in
+  the low nibble and the odd cell number in the high nibble. Each nibble holds the
+  open-wall bits NORTH, EAST, SOUTH and WEST.
+"""
+MAGIC = b"MAZE"
+VERSION = 1
+HAS_SEED = 1
+HEADER = struct.Struct("<4sHBxIIqIIII32s")
+MIN_SEED = -(1 << 63) # the seed is stored as a signed 64-bit int
+MAX_SEED = (1 << 63) - 1
+
+CHUNK_SIZE = 1 << 20 # cells packed at a time while writing
+HIGH_TABLE = bytes((value << 4) & 0xFF for value in range(256))
+LOW_NIBBLE_TABLE = bytes(value & 0x0F for value in range(256))
+HIGH_NIBBLE_TABLE = bytes(value >> 4 for value in range(256))
+
+class PackedWalls:
+  def __init__(self, buffer, offset, total):
+    """
+    PackedWalls constructor that takes in a buffer such as an mmap holding packed
+    walls at int offset for int total cells. Acts like a bytearray of one open-wall
+    value per cell, reading and writing nibbles of the buffer in place.
+    """
+    self.buffer = buffer
+    self.offset = offset
+    self.total = total
+
+  def __len__(self):
+    """
+    Returns the number of cells.
+    """
+    return self.total
+
+  def __getitem__(self, i):
+    """
+    Returns the open-wall bits of int cell number i.
+    """
+    if not 0 <= i < self.total:
+      raise IndexError("cell number out of range")
+    value = self.buffer[self.offset + (i >> 1)]
+    if i & 1:
+      return value >> 4
+    return value & 0x0F
+
+  def __setitem__(self, i, walls):
+    """
+    Sets the open-wall bits of int cell number i to int walls.
+    """
+    if not 0 <= i < self.total:
+      raise IndexError("cell number out of range")
+    j = self.offset + (i >> 1)
+    value = self.buffer[j]
+    if i & 1:
+      self.buffer[j] = (value & 0x0F) | (walls << 4)
+    else:
+      self.buffer[j] = (value & 0xF0) | walls
+
+  def packed(self):
+    """
+    Returns the packed wall bytes.
+    """
+    return self.buffer[self.offset : self.offset + get_packed_size(self.total)]
+
+def get_packed_size(total):
+  """
+  Returns the int number of bytes that int total cells take when packed.
+  """
+  return (total + 1) // 2
+
+def pack_walls(path):
+  """
+  Takes in a bytes-like path of one open-wall value per cell and yields it packed
+  two cells per byte, one chunk at a time.
+  """
+  if isinstance(path, PackedWalls):
+    yield path.packed()
+    return
+  for start in range(0, len(path), CHUNK_SIZE):
+    chunk = path[start : start + CHUNK_SIZE]
+    low = chunk[0::2]
+    high = chunk[1::2].translate(HIGH_TABLE).ljust(len(low), b"\0")
+    packed = int.from_bytes(low, "little") | int.from_bytes(high, "little")
+    yield packed.to_bytes(len(low), "little")
+
+def unpack_walls(path):
+  """
+  Takes in a bytes-like path of one open-wall value per cell, or PackedWalls, and
+  returns it as bytes of one open-wall value per cell.
+  """
+  if not isinstance(path, PackedWalls):
+    return bytes(path)
+  packed = path.packed()
+  walls = bytearray(2 * len(packed))
+  walls[0::2] = packed.translate(LOW_NIBBLE_TABLE)
+  walls[1::2] = packed.translate(HIGH_NIBBLE_TABLE)
+  return bytes(walls[:path.total])
+
+def write_maze(file, width, height, path, start, end, algorithm=None, seed=None):
+  """
+  Writes a maze of int width and int height with bytes-like open-wall path, tuple
+  start and tuple end cells, string algorithm and int seed to the binary file.
+  Raises ValueError if the seed does not fit in the file.
+  """
+  if seed is not None and not MIN_SEED <= seed <= MAX_SEED:
+    raise ValueError("seed %d does not fit in a maze file, which holds %d to %d" % (seed, MIN_SEED, MAX_SEED))
+  flags = HAS_SEED if seed is not None else 0
+  name = (algorithm or "").encode("utf-8")[:32]
+  file.write(HEADER.pack(MAGIC, VERSION, flags, width, height, seed or 0,
+                         start[0], start[1], end[0], end[1], name))
+  for packed in pack_walls(path):
+    file.write(packed)
+
+def read_header(header):
+  """
+  Takes in the bytes of a file header and returns a dictionary of its fields.
+  Raises ValueError if it is not a maze file.
+  """
+  magic, version, flags, width, height, seed, start_x, start_y, end_x, end_y, name = HEADER.unpack(header)
+  if magic != MAGIC or version != VERSION:
+    raise ValueError("not a version %d maze file" % VERSION)
+  return {
+    "width": width,
+    "height": height,
+    "seed": seed if flags & HAS_SEED else None,
+    "start": (start_x, start_y),
+    "end": (end_x, end_y),
+    "algorithm": name.rstrip(b"\0").decode("utf-8") or None
+  }
+
+def map_maze(file_path):
+  """
+  Memory-maps the maze file at string file_path. Returns its header dictionary and
+  PackedWalls over the mapping. Pages of the file are only read when their cells
+  are used, and changes stay in memory without touching the file.
+  """
+  with open(file_path, "rb") as file:
+    buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+  header = read_header(buffer[:HEADER.size])
+  total = header["width"] * header["height"]
+  if len(buffer) < HEADER.size + get_packed_size(total):
+    raise ValueError("maze file is truncated")
+  return header, PackedWalls(buffer, HEADER.size, total)
@@ -0,0 +1,135 @@
+#==============================================================================#
+# pathindex.py indexes a generated maze so the path between any two cells can  #
+# be found without searching. created by Andy Phan.                            #
+#==============================================================================#
+
+from array import array
+import numpy as np
+import constants
+
+NORTH = constants.NORTH
+EAST = constants.EAST
+SOUTH = constants.SOUTH
+WEST = constants.WEST
+
+def search(path, width, root):
+  """
+  Runs a breadth-first search from the int root cell number over the bytes-like
+  open-wall path of a maze of int width. Returns int arrays of the parent and depth
+  of every cell number, and of the cell numbers in the order they were reached. The
+  root is its own parent, and cells that cannot be reached have parent and depth -1.
+  """
+  parent = array('i', [-1]) * len(path)
+  depth = array('i', [-1]) * len(path)
+  parent[root] = root
+  depth[root] = 0
+  order = array('i', [root])
+  i = 0
+  while i < len(order):
+    cell_num = order[i]
+    i += 1
+    walls = path[cell_num]
+    next_depth = depth[cell_num] + 1
+    for bit, neighbor_num in ((NORTH, cell_num - width), (EAST, cell_num + 1),
+                              (SOUTH, cell_num + width), (WEST, cell_num - 1)):
+      if walls & bit and parent[neighbor_num] == -1:
+        parent[neighbor_num] = cell_num
+        depth[neighbor_num] = next_depth
+        order.append(neighbor_num)
+  return parent, depth, order
+
+"""
+Algorithm:
+1) A perfect maze is a tree. Root it at the starting cell and find the parent and
+  depth of every cell with one breadth-first search.
+2) Build jump tables where the k-th table holds the ancestor 2^k levels above each
+  cell, each table made from the one before it.
+3) To find the lowest common ancestor of two cells, jump the deeper cell up to the
+  depth of the other, then jump both up by decreasing powers of two while their
+  ancestors differ.
+4) The distance between two cells is the sum of their depths minus twice the depth
+  of their lowest common ancestor, and the path goes up from one cell to that
+  ancestor and down to the other.
+"""
+class PathIndex:
+  def __init__(self, maze, root=None):
+    """
+    PathIndex constructor that takes in a generated perfect maze and an optional
+    tuple root cell, the starting cell by default. Builds the index in one
+    breadth-first search plus O(n log depth) vectorized table building. Raises
+    ValueError if a cell cannot be reached.
+    """
+    self.maze = maze
+    if root is None:
+      root = maze.start
+    parent, depth, order = search(maze.path, maze.width, maze.get_number(root))
+    if len(order) != maze.total:
+      raise ValueError("maze is not connected")
+    self.depth = np.frombuffer(depth, dtype=np.intc)
+    self.jumps = [np.frombuffer(parent, dtype=np.intc)]
+    max_depth = int(self.depth.max()) if maze.total else 0
+    while (1 << len(self.jumps)) <= max_depth:
+      last = self.jumps[-1]
+      self.jumps.append(last[last])
+
+  def get_ancestor(self, cell_num, levels):
+    """
+    Returns the int cell number int levels above the int cell number cell_num.
+    """
+    k = 0
+    while levels:
+      if levels & 1:
+        cell_num = int(self.jumps[k][cell_num])
+      levels >>= 1
+      k += 1
+    return cell_num
+
+  def get_common_ancestor(self, a, b):
+    """
+    Returns the int cell number of the lowest common ancestor of int cell numbers a
+    and b in O(log n).
+    """
+    depth_a = int(self.depth[a])
+    depth_b = int(self.depth[b])
+    if depth_a < depth_b:
+      b = self.get_ancestor(b, depth_b - depth_a)
+    else:
+      a = self.get_ancestor(a, depth_a - depth_b)
+    if a == b:
+      return a
+    for jump in reversed(self.jumps):
+      if jump[a] != jump[b]:
+        a = int(jump[a])
+        b = int(jump[b])
+    return int(self.jumps[0][a])
+
+  def get_distance(self, cell, other):
+    """
+    Returns the int number of steps on the path between tuple cells cell and other
+    in O(log n).
+    """
+    a = self.maze.get_number(cell)
+    b = self.maze.get_number(other)
+    ancestor = self.get_common_ancestor(a, b)
+    return int(self.depth[a] + self.depth[b] - 2 * self.depth[ancestor])
+
+  def get_path(self, cell, other):
+    """
+    Returns the list of tuple cells on the path from tuple cell cell to tuple cell
+    other in O(path length).
+    """
+    maze = self.maze
+    parent = self.jumps[0]
+    a = maze.get_number(cell)
+    b = maze.get_number(other)
+    ancestor = self.get_common_ancestor(a, b)
+    up = [a]
+    while a != ancestor:
+      a = int(parent[a])
+      up.append(a)
+    down = []
+    while b != ancestor:
+      down.append(b)
+      b = int(parent[b])
+    down.reverse()
+    return [maze.get_cell(cell_num) for cell_num in up + down]
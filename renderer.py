@@ -0,0 +1,279 @@
+#==============================================================================#
+# renderer.py displays a maze on a pygame screen. created by Andy Phan.        #
+#==============================================================================#
+
+import pygame
+import constants
+from collections import deque
+
+WINDOW_WIDTH = constants.WINDOW_WIDTH
+WINDOW_HEIGHT = constants.WINDOW_HEIGHT
+GUI_X = constants.GUI_X
+
+TILE_SIZE = constants.TILE_SIZE
+WALL_SIZE = constants.WALL_SIZE
+
+BLACK = constants.BLACK
+STAGES = constants.STAGES
+SPECIAL = constants.SPECIAL
+PATHFIND = constants.PATHFIND
+
+EAST = constants.EAST
+SOUTH = constants.SOUTH
+
+COLORS = [STAGES.get(state, BLACK) for state in range(256)] # color of each int state
+DEFAULT_SCALE = TILE_SIZE + WALL_SIZE # largest pixels per cell when fitting a maze
+DETAIL_SCALE = 4 # fewest pixels per cell that still draw walls
+MAX_SCALE = 60
+
+class Renderer:
+  def __init__(self, screen, maze, rect=(0, 0, GUI_X, WINDOW_HEIGHT)):
+    """
+    Renderer constructor that takes in a screen object, the maze to display, and
+    the rect of the screen to display it in. Attach it to the maze with
+    maze.add_observer so it knows which cells changed. The maze must only be
+    changed from the thread that draws it; see EventQueue.
+    The view can be zoomed and panned. When zoomed in, each cell gets a block of
+    whole pixels holding its tile and its east and south walls, and only the
+    visible blocks are drawn. When zoomed out past DETAIL_SCALE, each cell is one
+    pixel of a palette surface that shares memory with the cell states, scaled to
+    fit, and walls are not shown.
+    """
+    self.screen = screen
+    self.maze = maze
+    self.rect = pygame.Rect(rect)
+    self.canvas = pygame.Surface(self.rect.size)
+    self.dirty = deque() # cells changed since the last frame
+    self.size = None
+    self.scale = DEFAULT_SCALE
+    self.view_x = 0 # cell coordinates of the top left of the view
+    self.view_y = 0
+    self.pixels = None
+    self.drawn = None # (pitch, x, y) in pixels of the blocks on the canvas
+    self.on_refresh()
+
+  def on_refresh(self):
+    """
+    Observer method called when the whole maze changes. The whole maze is redrawn on
+    the next frame.
+    """
+    self.refresh = True
+
+  def on_visit(self, cell, val):
+    """
+    Observer method called when the given tuple cell changes to val. Marks the cell
+    to be redrawn.
+    """
+    self.dirty.append(cell)
+
+  def on_connect(self, cell, neighbor):
+    """
+    Observer method called when two tuple cells are connected. Marks both cells to
+    be redrawn.
+    """
+    self.dirty.append(cell)
+    self.dirty.append(neighbor)
+
+  def on_disconnect(self, cell, neighbor):
+    """
+    Observer method called when the wall between two tuple cells is put back. Marks
+    both cells to be redrawn.
+    """
+    self.dirty.append(cell)
+    self.dirty.append(neighbor)
+
+  #==============================================================================#
+  #                                   VIEWPORT                                   #
+  #==============================================================================#
+
+  def get_scale(self):
+    """
+    Returns the pixels per cell actually drawn. Zoomed in, it is rounded down to
+    whole pixels so every block is the same size.
+    """
+    if self.scale >= DETAIL_SCALE:
+      return int(self.scale)
+    return self.scale
+
+  def fit(self):
+    """
+    Zooms and pans so the whole maze is centered in view, at no more than
+    DEFAULT_SCALE pixels per cell.
+    """
+    maze = self.maze
+    width, height = self.rect.size
+    self.scale = min(width / maze.width, height / maze.height, DEFAULT_SCALE)
+    scale = self.get_scale()
+    self.view_x = (maze.width - width / scale) / 2
+    self.view_y = (maze.height - height / scale) / 2
+    self.drawn = None
+
+  def zoom(self, factor, point=None):
+    """
+    Multiplies the pixels per cell by float factor, keeping the cell under the tuple
+    screen point in place. Zooms around the center of the view if point is None.
+    """
+    maze = self.maze
+    width, height = self.rect.size
+    if point is None:
+      point = self.rect.center
+    x = point[0] - self.rect.x
+    y = point[1] - self.rect.y
+    scale = self.get_scale()
+    cell_x = self.view_x + x / scale
+    cell_y = self.view_y + y / scale
+    min_scale = min(width / maze.width, height / maze.height, DEFAULT_SCALE) / 2
+    self.scale = min(max(self.scale * factor, min_scale), MAX_SCALE)
+    scale = self.get_scale()
+    self.view_x = cell_x - x / scale
+    self.view_y = cell_y - y / scale
+    self.drawn = None
+
+  def pan(self, dx, dy):
+    """
+    Moves the maze by int dx and int dy pixels on screen.
+    """
+    scale = self.get_scale()
+    self.view_x -= dx / scale
+    self.view_y -= dy / scale
+
+  #==============================================================================#
+  #                                    DRAWING                                   #
+  #==============================================================================#
+
+  def draw(self):
+    """
+    Redraws what changed in view onto the canvas, then displays it on screen.
+    """
+    maze = self.maze
+    if self.refresh:
+      self.refresh = False
+      self.dirty.clear()
+      if self.size != (maze.width, maze.height):
+        self.size = (maze.width, maze.height)
+        self.fit()
+      self.pixels = None
+      self.drawn = None
+    scale = self.get_scale()
+    if scale >= DETAIL_SCALE:
+      self.draw_detail(scale)
+    else:
+      self.dirty.clear()
+      self.draw_overview(scale)
+    self.screen.blit(self.canvas, self.rect)
+
+  def draw_overview(self, scale):
+    """
+    Draws the visible part of the maze at float scale pixels per cell, one pixel per
+    cell scaled to fit. The palette surface reads the cell states directly, so cell
+    changes need no drawing of their own.
+    """
+    maze = self.maze
+    if self.pixels is None:
+      self.pixels = pygame.image.frombuffer(maze.grid, (maze.width, maze.height), "P")
+      self.pixels.set_palette(COLORS)
+    width, height = self.rect.size
+    x0 = max(int(self.view_x), 0)
+    y0 = max(int(self.view_y), 0)
+    x1 = min(int(self.view_x + width / scale) + 1, maze.width)
+    y1 = min(int(self.view_y + height / scale) + 1, maze.height)
+    self.canvas.fill(BLACK)
+    if x0 >= x1 or y0 >= y1:
+      return
+    area = self.pixels.subsurface((x0, y0, x1 - x0, y1 - y0))
+    size = (max(round((x1 - x0) * scale), 1), max(round((y1 - y0) * scale), 1))
+    position = (round((x0 - self.view_x) * scale), round((y0 - self.view_y) * scale))
+    self.canvas.blit(pygame.transform.scale(area, size), position)
+
+  def draw_detail(self, pitch):
+    """
+    Draws the visible part of the maze at int pitch pixels per cell. After a pan the
+    canvas is scrolled and only the uncovered strips are drawn, and otherwise only
+    the changed cells are drawn.
+    """
+    width, height = self.rect.size
+    x = round(self.view_x * pitch)
+    y = round(self.view_y * pitch)
+    if self.drawn is not None:
+      dx = self.drawn[1] - x
+      dy = self.drawn[2] - y
+      if self.drawn[0] != pitch or abs(dx) >= width or abs(dy) >= height:
+        self.drawn = None
+      elif dx or dy:
+        self.canvas.scroll(dx, dy)
+        if dx > 0:
+          self.draw_region(pitch, x, y, (0, 0, dx, height))
+        elif dx < 0:
+          self.draw_region(pitch, x, y, (width + dx, 0, -dx, height))
+        if dy > 0:
+          self.draw_region(pitch, x, y, (0, 0, width, dy))
+        elif dy < 0:
+          self.draw_region(pitch, x, y, (0, height + dy, width, -dy))
+    if self.drawn is None:
+      self.dirty.clear()
+      self.draw_region(pitch, x, y, (0, 0, width, height))
+    self.drawn = (pitch, x, y)
+    dirty = self.dirty
+    while dirty:
+      cell_x, cell_y = dirty.popleft()
+      left = cell_x * pitch - x
+      top = cell_y * pitch - y
+      if -pitch <= left < width and -pitch <= top < height:
+        self.draw_block(cell_x, cell_y, pitch, x, y)
+        if cell_x != 0:
+          self.draw_block(cell_x - 1, cell_y, pitch, x, y)
+        if cell_y != 0:
+          self.draw_block(cell_x, cell_y - 1, pitch, x, y)
+
+  def draw_region(self, pitch, x, y, rect):
+    """
+    Clears the tuple rect of the canvas and draws every block that overlaps it, with
+    the view at int pixels x and y and int pitch pixels per cell.
+    """
+    maze = self.maze
+    left, top, width, height = rect
+    self.canvas.fill(BLACK, rect)
+    x0 = max((x + left) // pitch, 0)
+    y0 = max((y + top) // pitch, 0)
+    x1 = min((x + left + width - 1) // pitch + 1, maze.width)
+    y1 = min((y + top + height - 1) // pitch + 1, maze.height)
+    for cell_y in range(y0, y1):
+      for cell_x in range(x0, x1):
+        self.draw_block(cell_x, cell_y, pitch, x, y)
+
+  def draw_block(self, cell_x, cell_y, pitch, x, y):
+    """
+    Draws the block of the cell at int cell_x and int cell_y: its tile and its east
+    and south walls. Open walls take the color of the cells they join and closed
+    walls are drawn black.
+    """
+    maze = self.maze
+    wall = max(pitch * WALL_SIZE // DEFAULT_SCALE, 1)
+    tile = pitch - wall
+    left = cell_x * pitch - x
+    top = cell_y * pitch - y
+    cell_num = maze.width * cell_y + cell_x
+    curr = maze.grid[cell_num]
+    walls = maze.path[cell_num]
+    fill = self.canvas.fill
+    fill(COLORS[curr], (left, top, tile, tile))
+    color = BLACK
+    if walls & EAST:
+      color = self.get_wall_color(curr, maze.grid[cell_num + 1])
+    fill(color, (left + tile, top, wall, tile))
+    color = BLACK
+    if walls & SOUTH:
+      color = self.get_wall_color(curr, maze.grid[cell_num + maze.width])
+    fill(color, (left, top + tile, tile, wall))
+
+  def get_wall_color(self, curr, neighbor):
+    """
+    Helper method for draw_block. Returns the color of the open wall between cells
+    with int states curr and neighbor.
+    """
+    if curr == SPECIAL or curr == PATHFIND:
+      if neighbor == SPECIAL or neighbor == PATHFIND:
+        return COLORS[PATHFIND]
+    elif neighbor == SPECIAL or neighbor == PATHFIND:
+      return COLORS[curr]
+    return COLORS[neighbor]
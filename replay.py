@@ -0,0 +1,269 @@
+#==============================================================================#
+# replay.py records maze generation and solving steps and plays them back.     #
+# created by Andy Phan.                                                        #
+#==============================================================================#
+
+import queue
+import time
+from array import array
+
+REFRESH = -1 # cell value of a record that replaces the whole maze
+CONNECT = -1 # state value of a record that connects two cells
+DISCONNECT = -2 # state value of a record that puts a wall back between two cells
+QUEUE_SIZE = 1 << 16 # events waiting between a worker thread and the main thread
+BUDGET_CHECK = 256 # events applied between checks of the time budget
+
+class EventLog:
+  def __init__(self, maze):
+    """
+    EventLog constructor that takes in the maze to record. Pass it to generate or
+    solve, or attach it with maze.add_observer. Every step is stored as three ints
+    (cell number, new state, connected cell number) in one flat array.
+    """
+    self.maze = maze
+    self.events = array('i')
+    self.snapshots = [] # (grid, path) bytes of each REFRESH record
+    self.on_refresh()
+
+  def __len__(self):
+    """
+    Returns the number of recorded events.
+    """
+    return len(self.events) // 3
+
+  def get_event(self, i):
+    """
+    Returns the int i-th event as a tuple (cell number, state, connected cell number).
+    """
+    return tuple(self.events[3 * i : 3 * i + 3])
+
+  def tobytes(self):
+    """
+    Returns the events as a compact bytes object.
+    """
+    return self.events.tobytes()
+
+  def on_refresh(self):
+    """
+    Observer method called when the whole maze changes. Records a copy of the maze.
+    """
+    self.snapshots.append((bytes(self.maze.grid), bytes(self.maze.path)))
+    self.events.extend((REFRESH, len(self.snapshots) - 1, -1))
+
+  def on_visit(self, cell, val):
+    """
+    Observer method called when the given tuple cell changes to val. Records it.
+    """
+    self.events.extend((self.maze.get_number(cell), val, -1))
+
+  def on_connect(self, cell, neighbor):
+    """
+    Observer method called when two tuple cells are connected. Records it.
+    """
+    self.events.extend((self.maze.get_number(cell), CONNECT, self.maze.get_number(neighbor)))
+
+  def on_disconnect(self, cell, neighbor):
+    """
+    Observer method called when the wall between two tuple cells is put back.
+    Records it.
+    """
+    self.events.extend((self.maze.get_number(cell), DISCONNECT, self.maze.get_number(neighbor)))
+
+class Replay:
+  def __init__(self, log, maze):
+    """
+    Replay constructor that takes in an EventLog and the maze to play it on, which
+    must be the same size as the recorded one. Observers of the maze, such as a
+    Renderer, see every replayed step. Starts before the first event.
+    """
+    self.log = log
+    self.maze = maze
+    self.position = 0
+    self.previous = array('b', bytes(len(log))) # state of each visited cell before its event
+
+  def __len__(self):
+    """
+    Returns the number of events that can be replayed.
+    """
+    return len(self.log)
+
+  def is_done(self):
+    """
+    Returns whether every event has been replayed.
+    """
+    return self.position == len(self.log)
+
+  def step(self, count=1):
+    """
+    Plays int count events forward, or backward if count is negative. Stops at
+    either end of the log. Returns the number of events played.
+    """
+    target = min(max(self.position + count, 0), len(self.log))
+    played = abs(target - self.position)
+    while self.position < target:
+      self.apply(self.position)
+      self.position += 1
+    while self.position > target:
+      self.position -= 1
+      self.undo(self.position)
+    return played
+
+  def seek(self, position):
+    """
+    Moves the maze to the state after int position events.
+    """
+    self.step(position - self.position)
+
+  def apply(self, i):
+    """
+    Applies the int i-th event of the log to the maze. Keeps the state the cell had
+    before it, so the event can be undone. Events are only undone after being
+    applied, so the log never has to be read ahead of the replay.
+    """
+    cell_num, state, other = self.log.get_event(i)
+    if cell_num == REFRESH:
+      self.maze.set_state(*self.log.snapshots[state])
+    else:
+      if state >= 0:
+        self.previous[i] = self.maze.grid[cell_num]
+      apply_step(self.maze, cell_num, state, other)
+
+  def undo(self, i):
+    """
+    Reverts the int i-th event of the log on the maze. Undoing a refresh replays the
+    log from the refresh before it.
+    """
+    maze = self.maze
+    cell_num, state, other = self.log.get_event(i)
+    if cell_num == REFRESH:
+      start = i - 1
+      while start >= 0 and self.log.get_event(start)[0] != REFRESH:
+        start -= 1
+      for j in range(max(start, 0), i):
+        self.apply(j)
+    elif state == CONNECT:
+      maze.disconnect(maze.get_cell(cell_num), maze.get_cell(other))
+    elif state == DISCONNECT:
+      maze.connect(maze.get_cell(cell_num), maze.get_cell(other))
+    else:
+      maze.visit(maze.get_cell(cell_num), self.previous[i])
+
+class EventQueue:
+  def __init__(self, maze, size=QUEUE_SIZE):
+    """
+    EventQueue constructor that takes in the maze changed by a worker thread. Attach
+    it with maze.add_observer and the worker pushes every step into a queue of int
+    size events, waiting while it is full. The main thread calls apply to play them
+    on its own copy of the maze, so the two threads never share cell state and the
+    worker never calls pygame. Steps use the same records as EventLog, except that
+    a refresh record holds its snapshot (width, height, grid, path) directly.
+    While live is False, steps are not pushed at all, and the copy catches up with
+    one snapshot the next time the worker makes a step while live, or when sync is
+    called after the worker is done.
+    """
+    self.maze = maze
+    self.queue = queue.Queue(size)
+    self.live = True # set from the main thread
+    self.synced = True # whether every step so far was pushed
+
+  def is_empty(self):
+    """
+    Returns whether every pushed event has been applied.
+    """
+    return self.queue.empty()
+
+  def is_live(self):
+    """
+    Helper method for the observer methods. Returns whether the step should be
+    pushed. Pushes a snapshot instead if steps were skipped before it.
+    """
+    if not self.live:
+      self.synced = False
+      return False
+    if not self.synced:
+      self.sync()
+      return False
+    return True
+
+  def sync(self):
+    """
+    Pushes a snapshot of the maze if any steps were skipped. Only call it from the
+    thread changing the maze, or once that thread is done.
+    """
+    if not self.synced:
+      self.synced = True
+      self.push_snapshot()
+
+  def push_snapshot(self):
+    """
+    Pushes a refresh record holding a copy of the maze.
+    """
+    maze = self.maze
+    self.queue.put((REFRESH, (maze.width, maze.height, bytes(maze.grid), bytes(maze.path)), -1))
+
+  def on_refresh(self):
+    """
+    Observer method called when the whole maze changes. Pushes a copy of the maze.
+    """
+    if self.is_live():
+      self.push_snapshot()
+
+  def on_visit(self, cell, val):
+    """
+    Observer method called when the given tuple cell changes to val. Pushes it.
+    """
+    if self.is_live():
+      self.queue.put((self.maze.get_number(cell), val, -1))
+
+  def on_connect(self, cell, neighbor):
+    """
+    Observer method called when two tuple cells are connected. Pushes it.
+    """
+    if self.is_live():
+      self.queue.put((self.maze.get_number(cell), CONNECT, self.maze.get_number(neighbor)))
+
+  def on_disconnect(self, cell, neighbor):
+    """
+    Observer method called when the wall between two tuple cells is put back.
+    Pushes it.
+    """
+    if self.is_live():
+      self.queue.put((self.maze.get_number(cell), DISCONNECT, self.maze.get_number(neighbor)))
+
+  def apply(self, maze, limit=None, budget=None):
+    """
+    Plays waiting events on the given copy of the maze without waiting for more.
+    Stops after int limit events or float budget seconds if they are given. Returns
+    the number of events played.
+    """
+    count = 0
+    deadline = None if budget is None else time.perf_counter() + budget
+    while limit is None or count < limit:
+      try:
+        cell_num, state, other = self.queue.get_nowait()
+      except queue.Empty:
+        break
+      if cell_num == REFRESH:
+        width, height, grid, path = state
+        if maze.width != width or maze.height != height:
+          maze.reset_maze(width, height, bytearray(grid), bytearray(path))
+        else:
+          maze.set_state(grid, path)
+      else:
+        apply_step(maze, cell_num, state, other)
+      count += 1
+      if deadline is not None and count % BUDGET_CHECK == 0 and time.perf_counter() > deadline:
+        break
+    return count
+
+def apply_step(maze, cell_num, state, other):
+  """
+  Applies one record that is not a refresh, of int cell number, int state and int
+  connected cell number, to the maze.
+  """
+  if state == CONNECT:
+    maze.connect(maze.get_cell(cell_num), maze.get_cell(other))
+  elif state == DISCONNECT:
+    maze.disconnect(maze.get_cell(cell_num), maze.get_cell(other))
+  else:
+    maze.visit(maze.get_cell(cell_num), state)
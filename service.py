@@ -0,0 +1,333 @@
+#==============================================================================#
+# service.py serves maze generation, solving and path queries to other         #
+# processes over a local socket. created by Andy Phan.                         #
+#==============================================================================#
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import constants
+from cache import MazeCache
+from maze import Maze
+from mazefile import pack_walls
+from pathindex import PathIndex
+from tiled import generate_one
+
+GEN_ALGORITHMS = constants.GEN_ALGORITHMS
+SOL_ALGORITHMS = constants.SOL_ALGORITHMS
+MIN_SIZE = constants.MIN_SIZE
+VISITED = constants.VISITED
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_CAPACITY = 64 # mazes kept in the pool
+DEFAULT_MAX_PENDING = 256 # requests handled at once before reading stops
+MAX_CELLS = 1 << 24
+MAX_LINE = 1 << 20 # bytes in one request
+
+"""
+Protocol:
+Each request is one JSON object on its own line, and each response is one JSON
+object on its own line with the same "id". Responses may come back in a different
+order than the requests.
+1) {"op": "generate", "algorithm", "width", "height", "seed", "walls"}
+  Generates the maze, or reuses it from the pool. The seed is chosen if it is
+  missing. If "walls" is true, the open-wall bits are included packed two cells
+  per byte as in the binary maze file and base64 encoded.
+2) {"op": "solve", "algorithm", "width", "height", "seed", "solver"}
+  Solves the maze from its start to its end with the solver algorithm.
+3) {"op": "path", "algorithm", "width", "height", "seed", "from", "to", "distance_only"}
+  Returns the distance and path between any two [x, y] cells using a PathIndex.
+4) {"op": "batch", "requests": [...]}
+  Handles a list of requests together and returns a list of their responses.
+Successful responses hold "result", failed ones hold "error".
+"""
+class PooledMaze:
+  def __init__(self, maze):
+    """
+    PooledMaze constructor that takes in a generated Maze kept in the pool. The
+    PathIndex is built on its first path query, and the lock keeps solves and index
+    builds on the same maze from overlapping.
+    """
+    self.maze = maze
+    self.index = None
+    self.lock = asyncio.Lock()
+
+class MazeService:
+  def __init__(self, capacity=DEFAULT_CAPACITY, workers=None, max_pending=DEFAULT_MAX_PENDING, cache_directory=None):
+    """
+    MazeService constructor that takes in the int capacity of mazes kept in the
+    pool, the int number of worker processes used for generation, the int
+    max_pending requests handled at once, and an optional string cache_directory to
+    also keep generated mazes on disk.
+    """
+    self.capacity = capacity
+    self.pool = OrderedDict()
+    self.pending = {}
+    self.executor = ProcessPoolExecutor(max_workers=workers)
+    self.max_pending = max_pending
+    self.semaphore = None
+    self.cache = None
+    if cache_directory is not None:
+      self.cache = MazeCache(0, cache_directory)
+
+  async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """
+    Listens for connections on string host and int port until cancelled.
+    """
+    self.semaphore = asyncio.Semaphore(self.max_pending)
+    server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE)
+    try:
+      async with server:
+        await server.serve_forever()
+    finally:
+      self.executor.shutdown(cancel_futures=True)
+
+  async def handle_connection(self, reader, writer):
+    """
+    Handles every request on one connection. A request slot is taken before each
+    line is read, so once max_pending requests are in flight the service stops
+    reading and clients are slowed down by their full sockets.
+    """
+    write_lock = asyncio.Lock()
+    tasks = set()
+    try:
+      while True:
+        await self.semaphore.acquire()
+        try:
+          line = await reader.readline()
+        except (ConnectionError, ValueError):
+          line = b""
+        if not line:
+          self.semaphore.release()
+          break
+        task = asyncio.ensure_future(self.respond(line, writer, write_lock))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+      if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+      writer.close()
+
+  async def respond(self, line, writer, write_lock):
+    """
+    Handles the bytes request line, writes its response and frees its request slot.
+    Unexpected errors, such as a broken worker pool, still get an error response so
+    the client is not left waiting.
+    """
+    try:
+      try:
+        request = json.loads(line)
+      except ValueError:
+        response = {"id": None, "error": "request is not valid JSON"}
+      else:
+        try:
+          response = await self.handle(request)
+        except Exception as error:
+          request_id = request.get("id") if isinstance(request, dict) else None
+          response = {"id": request_id, "error": "%s: %s" % (type(error).__name__, error)}
+      async with write_lock:
+        writer.write(json.dumps(response).encode() + b"\n")
+        await writer.drain()
+    except ConnectionError:
+      pass
+    finally:
+      self.semaphore.release()
+
+  async def handle(self, request):
+    """
+    Takes in a request dictionary and returns its response dictionary.
+    """
+    response = {"id": request.get("id") if isinstance(request, dict) else None}
+    try:
+      if not isinstance(request, dict):
+        raise ValueError("request must be a JSON object")
+      op = request.get("op")
+      if op == "generate":
+        response["result"] = await self.generate(request)
+      elif op == "solve":
+        response["result"] = await self.solve(request)
+      elif op == "path":
+        response["result"] = await self.query_path(request)
+      elif op == "batch":
+        requests = request.get("requests")
+        if not isinstance(requests, list) or any(item.get("op") == "batch" for item in requests if isinstance(item, dict)):
+          raise ValueError("batch needs a list of requests that are not batches")
+        response["result"] = await asyncio.gather(*[self.handle(item) for item in requests])
+      else:
+        raise ValueError("unknown op %r" % op)
+    except (ValueError, TypeError, KeyError) as error:
+      response["error"] = "%s: %s" % (type(error).__name__, error)
+    return response
+
+  #==============================================================================#
+  #                                  OPERATIONS                                  #
+  #==============================================================================#
+
+  async def generate(self, request):
+    """
+    Handles a generate request dictionary and returns its result dictionary.
+    """
+    if request.get("seed") is None:
+      request = dict(request, seed=random.getrandbits(32))
+    maze = (await self.get_maze(request)).maze
+    result = {
+      "algorithm": maze.algorithm,
+      "width": maze.width,
+      "height": maze.height,
+      "seed": maze.seed,
+      "start": list(maze.start),
+      "end": list(maze.end)
+    }
+    if request.get("walls"):
+      result["walls"] = base64.b64encode(b"".join(pack_walls(maze.path))).decode("ascii")
+    return result
+
+  async def solve(self, request):
+    """
+    Handles a solve request dictionary and returns its result dictionary.
+    """
+    solver = request.get("solver", SOL_ALGORITHMS[0])
+    if solver not in SOL_ALGORITHMS:
+      raise ValueError("unknown solver %r" % solver)
+    entry = await self.get_maze(request, True)
+    async with entry.lock:
+      loop = asyncio.get_running_loop()
+      solution = await loop.run_in_executor(None, entry.maze.solve, solver)
+    return {"solver": solver, "length": len(solution) - 1, "solution": [list(cell) for cell in solution]}
+
+  async def query_path(self, request):
+    """
+    Handles a path request dictionary and returns its result dictionary.
+    """
+    entry = await self.get_maze(request, True)
+    maze = entry.maze
+    cell = self.get_cell(maze, request["from"])
+    other = self.get_cell(maze, request["to"])
+    if entry.index is None:
+      async with entry.lock:
+        if entry.index is None:
+          loop = asyncio.get_running_loop()
+          entry.index = await loop.run_in_executor(None, PathIndex, maze)
+    if request.get("distance_only"):
+      return {"distance": entry.index.get_distance(cell, other)}
+    path = entry.index.get_path(cell, other)
+    return {"distance": len(path) - 1, "path": [list(cell) for cell in path]}
+
+  def get_cell(self, maze, value):
+    """
+    Takes in a Maze and a JSON [x, y] value and returns it as a tuple cell. Raises
+    ValueError if it is not a cell of the maze.
+    """
+    x, y = value
+    if not (isinstance(x, int) and isinstance(y, int) and 0 <= x < maze.width and 0 <= y < maze.height):
+      raise ValueError("cell %r is outside the maze" % (value,))
+    return (x, y)
+
+  #==============================================================================#
+  #                                   MAZE POOL                                  #
+  #==============================================================================#
+
+  def get_key(self, request, seed_required=False):
+    """
+    Returns the tuple (algorithm, width, height, seed) of the maze a request
+    dictionary refers to. Raises ValueError if it is not a valid maze.
+    """
+    algorithm = request.get("algorithm", GEN_ALGORITHMS[0])
+    width = request["width"]
+    height = request["height"]
+    seed = request.get("seed")
+    if algorithm not in GEN_ALGORITHMS:
+      raise ValueError("unknown algorithm %r" % algorithm)
+    if not (isinstance(width, int) and isinstance(height, int) and width >= MIN_SIZE and height >= MIN_SIZE):
+      raise ValueError("width and height must be ints of at least %d" % MIN_SIZE)
+    if width * height > MAX_CELLS:
+      raise ValueError("mazes are limited to %d cells" % MAX_CELLS)
+    if seed_required and seed is None:
+      raise ValueError("seed is required")
+    if not isinstance(seed, int):
+      raise ValueError("seed must be an int")
+    return (algorithm, width, height, seed)
+
+  async def get_maze(self, request, seed_required=False):
+    """
+    Returns the PooledMaze a request dictionary refers to, generating it if it is
+    not in the pool. Requests for a maze that is already being generated wait for
+    that generation instead of starting another.
+    """
+    key = self.get_key(request, seed_required)
+    entry = self.pool.get(key)
+    if entry is not None:
+      self.pool.move_to_end(key)
+      return entry
+    task = self.pending.get(key)
+    if task is None:
+      task = asyncio.ensure_future(self.load_maze(key))
+      self.pending[key] = task
+      task.add_done_callback(lambda task: self.pending.pop(key, None))
+    return await asyncio.shield(task)
+
+  async def load_maze(self, key):
+    """
+    Helper method for get_maze. Reads the maze of the tuple key from the disk cache
+    or generates it in a worker process, then adds it to the pool, removing the
+    least recently used maze if there are more than capacity. Disk access and
+    building the maze run in threads, so other requests are not held up.
+    """
+    loop = asyncio.get_running_loop()
+    path = None
+    if self.cache is not None:
+      path = await loop.run_in_executor(None, self.cache.get, key)
+    if path is None:
+      path = await loop.run_in_executor(self.executor, generate_one, key)
+      if self.cache is not None:
+        await loop.run_in_executor(None, self.cache.put, key, path)
+    maze = await loop.run_in_executor(None, build_maze, key, path)
+    entry = PooledMaze(maze)
+    self.pool[key] = entry
+    while len(self.pool) > self.capacity:
+      self.pool.popitem(last=False)
+    return entry
+
+def build_maze(key, path):
+  """
+  Takes in the tuple key (algorithm, width, height, seed) of a generated maze and
+  its open-wall bytes, and returns it as a Maze ready to solve.
+  """
+  algorithm, width, height, seed = key
+  maze = Maze(width, height)
+  maze.set_state(bytes([VISITED]) * maze.total, path)
+  maze.algorithm = algorithm
+  maze.seed = seed
+  maze.restore_maze()
+  return maze
+
+def main(argv=None):
+  """
+  Command line entry point. Runs the service until interrupted.
+  """
+  parser = argparse.ArgumentParser(description="Serve maze generation, solving and path queries.")
+  parser.add_argument("--host", default=DEFAULT_HOST)
+  parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+  parser.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY, help="mazes kept in memory")
+  parser.add_argument("--workers", type=int, default=os.cpu_count(), help="generation processes")
+  parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING,
+                      help="requests handled at once before reading stops")
+  parser.add_argument("--cache-dir", help="directory to also keep generated mazes in")
+  args = parser.parse_args(argv)
+
+  service = MazeService(args.capacity, args.workers, args.max_pending, args.cache_dir)
+  try:
+    asyncio.run(service.serve(args.host, args.port))
+  except KeyboardInterrupt:
+    pass
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,107 @@
+#==============================================================================#
+# stats.py counts what the maze algorithms do and how long they take. created  #
+# by Andy Phan.                                                                #
+#==============================================================================#
+
+import time
+import constants
+
+STATE_NAMES = {
+  constants.VISITED: "VISITED",
+  constants.UNVISITED: "UNVISITED",
+  constants.PROCESSED: "PROCESSED",
+  constants.SPECIAL: "SPECIAL",
+  constants.PATHFIND: "PATHFIND"
+}
+
+DEFAULT_INTERVAL = 10000 # visits between callbacks
+
+class MazeStats:
+  def __init__(self, callback=None, interval=DEFAULT_INTERVAL):
+    """
+    MazeStats constructor that takes in an optional callback function and the int
+    interval of visits between calls to it. Attach it by setting maze.stats, and
+    detach it by setting maze.stats back to None, which makes the counting free.
+    The callback is called with the stats every interval visits and at the end of
+    every phase, from whichever thread runs the algorithm.
+    """
+    self.callback = callback
+    self.interval = interval
+    self.reset()
+
+  def reset(self):
+    """
+    Clears every count and timing.
+    """
+    self.visits = 0
+    self.transitions = {} # (old state, new state) -> count
+    self.finds = 0
+    self.unions = 0
+    self.high_water = {} # structure name -> largest size
+    self.timings = {} # phase name -> total seconds
+    self.phase = None
+    self.phase_start = 0
+    self.phase_visits = 0
+    self.last_rate = 0
+
+  def record_visit(self, old, new):
+    """
+    Counts a cell changing from int state old to int state new.
+    """
+    self.visits += 1
+    key = (old, new)
+    self.transitions[key] = self.transitions.get(key, 0) + 1
+    if self.callback is not None and self.visits % self.interval == 0:
+      self.callback(self)
+
+  def record_size(self, name, size):
+    """
+    Keeps the largest int size seen of the structure with string name, such as a
+    stack, queue or frontier.
+    """
+    if size > self.high_water.get(name, 0):
+      self.high_water[name] = size
+
+  def begin_phase(self, name):
+    """
+    Starts timing the phase with string name, such as "generate DFS".
+    """
+    self.phase = name
+    self.phase_start = time.perf_counter()
+    self.phase_visits = self.visits
+
+  def end_phase(self):
+    """
+    Stops timing the current phase and adds its time to its total.
+    """
+    seconds = time.perf_counter() - self.phase_start
+    self.timings[self.phase] = self.timings.get(self.phase, 0) + seconds
+    if seconds:
+      self.last_rate = (self.visits - self.phase_visits) / seconds
+    self.phase = None
+    if self.callback is not None:
+      self.callback(self)
+
+  def get_rate(self):
+    """
+    Returns the float visits per second of the running phase, or of the last phase
+    if none is running.
+    """
+    if self.phase is None:
+      return self.last_rate
+    seconds = time.perf_counter() - self.phase_start
+    return (self.visits - self.phase_visits) / seconds if seconds else 0
+
+  def summary(self):
+    """
+    Returns every count and timing as a multi-line string.
+    """
+    lines = ["visits: %d" % self.visits]
+    for (old, new), count in sorted(self.transitions.items(), key=lambda item: -item[1]):
+      lines.append("  %s -> %s: %d" % (STATE_NAMES.get(old, old), STATE_NAMES.get(new, new), count))
+    lines.append("finds: %d, unions: %d" % (self.finds, self.unions))
+    for name, size in sorted(self.high_water.items()):
+      lines.append("largest %s: %d" % (name, size))
+    for name, seconds in sorted(self.timings.items()):
+      lines.append("%s: %.3f s" % (name, seconds))
+    return "\n".join(lines)
@@ -0,0 +1,98 @@
+#==============================================================================#
+# tiled.py generates giant mazes as tiles in worker processes and stitches the #
+# tiles together into one maze. created by Andy Phan.                          #
+#==============================================================================#
+
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from maze import Maze
+
+DEFAULT_TILE_SIZE = 1000
+
+def generate_one(job):
+  """
+  Takes in a tuple job of (algorithm, width, height, seed), generates that maze
+  and returns its open-wall bytes. Runs inside a worker process, for one tile here
+  and for one whole maze in batch.py and service.py.
+  """
+  algorithm, width, height, seed = job
+  maze = Maze(width, height)
+  maze.generate(algorithm, seed=seed)
+  return bytes(maze.path)
+
+"""
+Algorithm:
+1) Split the maze into tiles of at most tile_width by tile_height cells.
+2) Generate each tile as its own maze in a worker process with the given algorithm.
+  Each tile is a spanning tree of its own cells.
+3) Copy the tiles into the maze.
+4) For each pair of neighboring tiles, choose a random wall on their shared border.
+5) Go through those walls in random order, and like kruskal's algorithm, remove a
+  wall only if the tiles on both sides are from different disjoint sets.
+This joins the tiles with one wall per tile left over, so the result is still a
+perfect maze.
+"""
+def generate_tiled(algorithm, width, height, tile_width=DEFAULT_TILE_SIZE, tile_height=DEFAULT_TILE_SIZE,
+                   seed=None, workers=None):
+  """
+  Generates and returns a Maze of int width and int height by generating tiles of
+  int tile_width and int tile_height with the string algorithm across int workers
+  processes and stitching them together. The same seed and tile size always
+  generate the same maze, no matter the number of workers.
+  """
+  rng = random.Random(seed)
+  columns = -(-width // tile_width)
+  rows = -(-height // tile_height)
+  tiles = []
+  for row in range(rows):
+    for column in range(columns):
+      x = column * tile_width
+      y = row * tile_height
+      tiles.append((x, y, min(tile_width, width - x), min(tile_height, height - y)))
+  jobs = [(algorithm, w, h, rng.getrandbits(64)) for x, y, w, h in tiles]
+
+  maze = Maze(width, height)
+  with ProcessPoolExecutor(max_workers=workers) as executor:
+    for tile, path in zip(tiles, executor.map(generate_one, jobs)):
+      copy_tile(maze, tile, path)
+
+  stitch_tiles(maze, tiles, columns, rows, rng)
+  maze.algorithm = "%s %dx%d tiles" % (algorithm, tile_width, tile_height)
+  maze.seed = seed
+  maze.restore_maze()
+  return maze
+
+def copy_tile(maze, tile, path):
+  """
+  Copies the bytes open-wall path of a generated tile into the maze at the tile's
+  tuple (x, y, width, height).
+  """
+  x, y, width, height = tile
+  for row in range(height):
+    start = (y + row) * maze.width + x
+    maze.path[start : start + width] = path[row * width : (row + 1) * width]
+
+def stitch_tiles(maze, tiles, columns, rows, rng):
+  """
+  Joins the generated tiles of the maze, laid out in int columns and int rows, into
+  one perfect maze. Picks one random border wall per pair of neighboring tiles and
+  removes walls in random order between tiles from different disjoint sets.
+  """
+  seams = []
+  for i, (x, y, width, height) in enumerate(tiles):
+    if i % columns != columns - 1:
+      y2 = y + rng.randrange(height)
+      seams.append((i, i + 1, (x + width - 1, y2), (x + width, y2)))
+    if i // columns != rows - 1:
+      x2 = x + rng.randrange(width)
+      seams.append((i, i + columns, (x2, y + height - 1), (x2, y + height)))
+  rng.shuffle(seams)
+  disjoint_set = array('i', [-1]) * len(tiles)
+  components = len(tiles)
+  for tile, neighbor_tile, cell, neighbor in seams:
+    if components == 1:
+      break
+    if maze.union(disjoint_set, tile, neighbor_tile):
+      maze.connect(cell, neighbor)
+      components -= 1
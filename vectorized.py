@@ -0,0 +1,84 @@
+#==============================================================================#
+# vectorized.py generates mazes with NumPy a whole grid at a time instead of   #
+# one cell at a time. created by Andy Phan.                                    #
+#==============================================================================#
+
+import numpy as np
+import constants
+
+NORTH = constants.NORTH
+EAST = constants.EAST
+SOUTH = constants.SOUTH
+WEST = constants.WEST
+
+def get_walls(path, width, height):
+  """
+  Takes in a writable bytes-like path of open-wall bits and returns it as a
+  height by width NumPy array sharing the same memory.
+  """
+  return np.frombuffer(path, dtype=np.uint8).reshape(height, width)
+
+def carve(walls, north, east):
+  """
+  Takes in a height by width array of open-wall bits and boolean arrays north and
+  east of the same shape, and opens the north and east walls of the marked cells
+  along with the matching walls of their neighbors.
+  """
+  walls |= north * np.uint8(NORTH)
+  walls[:-1, :] |= north[1:, :] * np.uint8(SOUTH)
+  walls |= east * np.uint8(EAST)
+  walls[:, 1:] |= east[:, :-1] * np.uint8(WEST)
+
+"""
+Algorithm:
+1) For each cell, randomly choose to form a path with the cell above or the cell to
+  the right.
+2) Cells in the top row always go right, and cells in the right column always go
+  up. The top right cell does neither.
+All cells are decided at once from one array of random bits.
+"""
+def carve_binary_tree(path, width, height, rng):
+  """
+  Generates a maze into the bytes-like open-wall path of int width and int height
+  using the binary tree algorithm with NumPy Generator rng.
+  """
+  walls = get_walls(path, width, height)
+  up = rng.integers(0, 2, size=(height, width), dtype=np.uint8).astype(bool)
+  up[:, -1] = True
+  up[0, :] = False
+  right = ~up
+  right[:, -1] = False
+  carve(walls, up, right)
+
+"""
+Algorithm:
+1) Form a path along the whole top row.
+2) For each other row, randomly decide for each cell whether to end the current run
+  of cells there. The last cell of a row always ends the run.
+3) Form paths to the right between cells of the same run, and a path up from one
+  random cell of each run.
+All rows are decided at once: runs are numbered with a cumulative sum over the
+flattened rows and one random cell is picked per run.
+"""
+def carve_sidewinder(path, width, height, rng):
+  """
+  Generates a maze into the bytes-like open-wall path of int width and int height
+  using the sidewinder algorithm with NumPy Generator rng.
+  """
+  walls = get_walls(path, width, height)
+  up = np.zeros((height, width), dtype=bool)
+  right = np.zeros((height, width), dtype=bool)
+  right[0, :-1] = True
+  if height > 1:
+    ends = rng.integers(0, 2, size=(height - 1, width), dtype=np.uint8).astype(bool)
+    ends[:, -1] = True
+    right[1:, :] = ~ends
+    ends = ends.ravel()
+    starts = np.empty_like(ends)
+    starts[0] = True
+    starts[1:] = ends[:-1]
+    run_starts = np.flatnonzero(starts)
+    run_lengths = np.flatnonzero(ends) - run_starts + 1
+    chosen = run_starts + (rng.random(len(run_starts)) * run_lengths).astype(np.int64)
+    up.reshape(-1)[width + chosen] = True
+  carve(walls, up, right)